@@ -0,0 +1,23 @@
+# Gunicorn configuration: gunicorn -c gunicorn.conf.py wakyefest_backend.wsgi:application
+from decouple import config
+
+bind = config('GUNICORN_BIND', default='0.0.0.0:8000')
+workers = config('GUNICORN_WORKERS', default=2, cast=int)
+timeout = config('GUNICORN_TIMEOUT', default=30, cast=int)
+
+# Load Django once in the master so workers fork already initialised
+preload_app = config('GUNICORN_PRELOAD', default=True, cast=bool)
+
+
+def when_ready(server):
+    # With preload_app the master has the app loaded by now; warm it before forking workers
+    if preload_app:
+        from wakyefest_backend.startup import warm_up
+        warm_up()
+        server.log.info("Application warmed up in master")
+
+
+def post_worker_init(worker):
+    if not preload_app:
+        from wakyefest_backend.startup import warm_up
+        warm_up()
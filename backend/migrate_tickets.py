@@ -1,4 +1,5 @@
 from tickets.models import Event, Ticket
+from tickets.caching import bump_tickets, ids_to_bump
 
 # Create or get the default event
 event, created = Event.objects.get_or_create(
@@ -21,9 +22,10 @@ else:
 
 # Link orphaned tickets
 orphaned = Ticket.objects.filter(event__isnull=True)
-count = orphaned.count()
-if count > 0:
-    orphaned.update(event=event)
+ids = ids_to_bump(orphaned)
+if ids:
+    count = orphaned.update(event=event)
+    bump_tickets(ids)
     print(f"Linked {count} tickets to {event.name}")
 else:
     print("No orphaned tickets found.")
@@ -0,0 +1,138 @@
+"""
+Stateless JWT authentication.
+
+simplejwt's ``JWTAuthentication`` loads the ``User`` row on every request. With
+``JWT_AUTH_MODE = 'stateless'`` access tokens carry the claims the views need
+(``is_staff``, ``is_superuser``, ``username``) and ``ClaimsJWTAuthentication``
+returns a ``TokenUser`` built from them, so authenticated requests make no user
+query. Refreshing re-reads the claims from the database. When a user's
+claims change (e.g. a superuser is demoted), access tokens issued up to that
+second are rejected so the client has to refresh and pick up the new flags. Tokens
+issued before the claims existed fall back to a user lookup that is cached for
+``JWT_USER_CACHE_SECONDS``.
+
+Deleted or deactivated users are put on a revocation list in the cache for the
+refresh token lifetime, so their outstanding tokens stop working right away.
+Revocations live in the default cache, so they only reach every gunicorn worker
+with REDIS_URL set; JWT_AUTH_MODE defaults to 'database' without it.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+# Claims copied from the user into every token; their presence marks a token as stateless-capable
+USER_CLAIMS = ('username', 'is_staff', 'is_superuser')
+
+
+def _revoked_key(user_id):
+    return f'jwt-revoked:{user_id}'
+
+
+def _user_key(user_id):
+    return f'jwt-user:{user_id}'
+
+
+def _claims_changed_key(user_id):
+    return f'jwt-claims-changed:{user_id}'
+
+
+def revoke_user_tokens(user_id):
+    """Reject every token issued to the user until they would all have expired"""
+    cache.set(_revoked_key(user_id), True, int(api_settings.REFRESH_TOKEN_LIFETIME.total_seconds()))
+    cache.delete(_user_key(user_id))
+
+
+def expire_user_claims(user_id):
+    """Reject access tokens issued until now; refreshing issues one with the current claims"""
+    cache.set(_claims_changed_key(user_id), int(time.time()), int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()))
+    cache.delete(_user_key(user_id))
+
+
+def restore_user_tokens(user_id):
+    cache.delete(_revoked_key(user_id))
+
+
+def invalidate_cached_user(user_id):
+    cache.delete(_user_key(user_id))
+
+
+def get_cached_user(user_id):
+    """Active user by id, cached for a short time; raises AuthenticationFailed otherwise"""
+    user = cache.get(_user_key(user_id))
+    if user is None:
+        User = get_user_model()
+        try:
+            user = User.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+        except User.DoesNotExist:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+        cache.set(_user_key(user_id), user, settings.JWT_USER_CACHE_SECONDS)
+    if not user.is_active:
+        raise AuthenticationFailed('User is inactive', code='user_inactive')
+    return user
+
+
+def resolve_user(user):
+    """The User model instance behind request.user, for views that need real fields"""
+    if isinstance(user, TokenUser):
+        return get_cached_user(user.id)
+    return user
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        # Checked first: simplejwt fails with a server error for deleted users
+        user_id = self.token_class(attrs['refresh']).get(api_settings.USER_ID_CLAIM)
+        if cache.get(_revoked_key(user_id)):
+            raise AuthenticationFailed('Token has been revoked', code='token_revoked')
+        data = super().validate(attrs)
+        access = AccessToken(data['access'])
+        user = get_user_model().objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+        if user is None or not user.is_active:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+        # Current flags rather than the ones copied from the refresh token
+        for claim in USER_CLAIMS:
+            access[claim] = getattr(user, claim)
+        data['access'] = str(access)
+        return data
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that trusts the token's claims instead of loading the user"""
+
+    def get_user(self, validated_token):
+        if settings.JWT_AUTH_MODE != 'stateless':
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+
+        state = cache.get_many([_revoked_key(user_id), _claims_changed_key(user_id)])
+        if state.get(_revoked_key(user_id)):
+            raise AuthenticationFailed('Token has been revoked', code='token_revoked')
+        changed_at = state.get(_claims_changed_key(user_id))
+        # iat has one-second resolution, so a token from the same second is rejected too
+        if changed_at is not None and validated_token.get('iat', 0) <= changed_at:
+            raise InvalidToken('Token claims are out of date')
+        if all(claim in validated_token for claim in USER_CLAIMS):
+            return TokenUser(validated_token)
+        # Issued before the claims were added
+        return get_cached_user(user_id)
@@ -0,0 +1,188 @@
+"""
+Versioned response caching with ETag/Last-Modified support.
+
+Each cached namespace ('events', 'tickets', 'ticket:<id>') has a version stamp
+in the cache, set to the time of the last write to that data. 'tickets' covers
+aggregates over all tickets; a single ticket's page only depends on its own
+namespace, so checkouts and check-ins elsewhere do not evict it. Responses are cached under a
+key derived from the request and the versions they depend on, so a write only
+needs to bump the version for every cached response built from the old data
+to stop being served. Model signals bump versions on save/delete; code that
+uses ``QuerySet.update()`` must call ``bump_version`` (or ``bump_tickets``)
+itself.
+
+Versions live in the default cache, which is only shared between gunicorn
+workers when REDIS_URL is set; RESPONSE_CACHE_ENABLED therefore defaults to
+off without it, since a worker would never see another worker's bumps.
+"""
+import functools
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from .compression import negotiate_encoding, precompress, supported_encodings, weaken_etag
+from .models import Inquiry
+
+EVENTS = 'events'
+TICKETS = 'tickets'
+# Every ticket page also depends on this; bumped instead of per-ticket versions for big bulk writes
+TICKETS_BULK = 'tickets-bulk'
+# Beyond this many tickets one write invalidates all ticket pages rather than each of them
+BUMP_TICKETS_LIMIT = 1000
+
+
+def _version_key(namespace):
+    return f'cache-version:{namespace}'
+
+
+def _version_timeout():
+    # Outlives the responses cached under it; an expired version is simply recreated
+    # newer, which only costs a cache miss, so per-ticket keys cannot pile up forever
+    return 2 * settings.RESPONSE_CACHE_TIMEOUT
+
+
+def get_versions(namespaces):
+    """(versions, keys of the versions created by this call)"""
+    keys = [_version_key(ns) for ns in namespaces]
+    found = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in found}
+    for key, version in missing.items():
+        # add() keeps a version another worker set in the meantime
+        cache.add(key, version, _version_timeout())
+    if missing:
+        found.update(cache.get_many(list(missing)))
+    return [found.get(key, missing.get(key)) for key in keys], list(missing)
+
+
+def bump_version(*namespaces):
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return
+    now = time.time_ns()
+    cache.set_many({_version_key(ns): now for ns in namespaces}, _version_timeout())
+
+
+def ticket_namespace(ticket_id):
+    return f'ticket:{ticket_id}'
+
+
+def bump_tickets(ticket_ids):
+    """Invalidate the ticket aggregates and the pages of the given tickets"""
+    ticket_ids = list(ticket_ids)
+    if len(ticket_ids) > BUMP_TICKETS_LIMIT:
+        bump_version(TICKETS, TICKETS_BULK)
+    else:
+        bump_version(TICKETS, *(ticket_namespace(ticket_id) for ticket_id in ticket_ids))
+
+
+def ids_to_bump(queryset):
+    """
+    Ids for ``bump_tickets`` after a set-based write to ``queryset``, read before
+    the write (which may change what the filter matches). Capped just past
+    BUMP_TICKETS_LIMIT, so a huge selection is never loaded into memory.
+    """
+    return list(queryset.order_by().values_list('id', flat=True)[:BUMP_TICKETS_LIMIT + 1])
+
+
+def cached_http_response(request, cached):
+    """The cached body, or its precompressed variant when the client accepts one"""
+    encoded = cached.get('encoded') if settings.COMPRESSION_ENABLED else None
+    encoded = encoded or {}
+    encoding = negotiate_encoding(request, available=[e for e in supported_encodings() if e in encoded])
+    if encoding is None:
+        response = HttpResponse(cached['content'], content_type=cached['content_type'])
+    else:
+        response = HttpResponse(encoded[encoding], content_type=cached['content_type'])
+        response['Content-Encoding'] = encoding
+    # The cache key includes the negotiated media type (and encoding when variants exist)
+    patch_vary_headers(response, ('Accept', 'Accept-Encoding') if encoded else ('Accept',))
+    return response
+
+
+def cache_response(*namespaces, public=False):
+    """
+    Serve a view handler's GET with ETag/Last-Modified validators and keep the
+    rendered bytes, plus gzip/brotli variants of them, in the cache until one
+    of ``namespaces`` changes. A namespace may be a callable, called with the
+    view's URL kwargs, for per-object versions.
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(self, request, *args, **kwargs):
+            if not settings.RESPONSE_CACHE_ENABLED:
+                return handler(self, request, *args, **kwargs)
+
+            versions, created = get_versions([ns(**kwargs) if callable(ns) else ns for ns in namespaces])
+            last_modified = max(versions) // 1_000_000_000
+            fingerprint = '|'.join([
+                request.get_full_path(),
+                request.accepted_media_type or '',
+                *(str(v) for v in versions),
+            ])
+            digest = hashlib.sha256(fingerprint.encode()).hexdigest()[:32]
+            etag = f'"{digest}"'
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                cache_key = f'response:{digest}'
+                cached = cache.get(cache_key)
+                if cached is None:
+                    try:
+                        response = handler(self, request, *args, **kwargs)
+                    finally:
+                        # No version is kept for what does not exist (e.g. unknown ticket ids, which raise 404)
+                        if created and (response is None or response.status_code != 200):
+                            cache.delete_many(created)
+                    if response.status_code != 200:
+                        return response
+                    # Render now so the cached bytes match what the client receives
+                    response = self.finalize_response(request, response, *args, **kwargs)
+                    response.render()
+                    cached = {
+                        'content': response.content,
+                        'content_type': response['Content-Type'],
+                        # Compressed once here instead of on every hit
+                        'encoded': precompress(response.content, response['Content-Type']),
+                    }
+                    cache.set(cache_key, cached, settings.RESPONSE_CACHE_TIMEOUT)
+                response = cached_http_response(request, cached)
+
+            response['ETag'] = etag
+            if response.has_header('Content-Encoding'):
+                weaken_etag(response)
+            response['Last-Modified'] = http_date(last_modified)
+            if public:
+                patch_cache_control(response, public=True, max_age=0, must_revalidate=True)
+            else:
+                patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
+
+
+# Unread inquiry counter polled by the dashboard. Cached until an inquiry is
+# created, changed or deleted; the timeout only bounds drift if an
+# invalidation is ever missed. Invalidation is explicit rather than a signal
+# so bulk deletes stay a single DELETE statement. Without a shared cache an
+# invalidation would only reach one worker, so the count comes straight from
+# the partial unread index (inquiry_unread_idx) instead.
+UNREAD_INQUIRIES_KEY = 'inquiries:unread-count'
+UNREAD_INQUIRIES_TIMEOUT = 300
+
+
+def get_unread_inquiry_count():
+    if not settings.SHARED_CACHE:
+        return Inquiry.objects.filter(is_read=False).count()
+    count = cache.get(UNREAD_INQUIRIES_KEY)
+    if count is None:
+        count = Inquiry.objects.filter(is_read=False).count()
+        cache.set(UNREAD_INQUIRIES_KEY, count, UNREAD_INQUIRIES_TIMEOUT)
+    return count
+
+
+def invalidate_unread_inquiry_count():
+    cache.delete(UNREAD_INQUIRIES_KEY)
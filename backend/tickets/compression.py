@@ -0,0 +1,166 @@
+"""
+Negotiated response compression.
+
+``CompressionMiddleware`` compresses JSON responses under
+``COMPRESSION_PATHS`` (the API) with brotli or gzip, whichever the client
+prefers (brotli needs ``pip install brotli``; without it only gzip is
+offered). Streaming responses such as CSV exports are compressed chunk by
+chunk, flushing after every chunk so nothing is held back. Responses that already carry a
+Content-Encoding are left alone, which is how ``cache_response`` serves the
+precompressed variants it stores next to the cached bytes.
+
+HTML pages, which carry CSRF tokens next to reflected input, are never
+compressed, and neither are API paths that return credentials
+(``COMPRESSION_EXCLUDED_PATHS``), so secrets cannot leak through compressed
+sizes (BREACH).
+"""
+import gzip
+import re
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # brotli is optional
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/', 'application/javascript', 'image/svg+xml')
+# Stored once per cache version, so worth a slower, smaller encoding than per-request compression
+PRECOMPRESS_GZIP_LEVEL = 9
+PRECOMPRESS_BROTLI_QUALITY = 9
+
+_accept_encoding_re = re.compile(r'([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?')
+
+
+def supported_encodings():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate_encoding(request, available=None):
+    """Best encoding in ``available`` (default: all supported) that the client accepts, or None"""
+    header = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    if not header:
+        return None
+    accepted = {}
+    for part in header.split(','):
+        match = _accept_encoding_re.match(part.strip())
+        if match:
+            accepted[match[1].lower()] = float(match[2]) if match[2] else 1.0
+    best, best_q = None, 0.0
+    # Server preference breaks ties: br before gzip
+    for encoding in available if available is not None else supported_encodings():
+        q = accepted.get(encoding, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def is_compressible(content_type):
+    return any(content_type.startswith(prefix) for prefix in COMPRESSIBLE_TYPES)
+
+
+def should_compress(request, response):
+    """API JSON bodies and streamed exports only; never HTML or credential-bearing paths"""
+    path = request.path_info
+    if any(path.startswith(prefix) for prefix in settings.COMPRESSION_EXCLUDED_PATHS):
+        return False
+    content_type = response.get('Content-Type', '')
+    if response.streaming:
+        return is_compressible(content_type) and not content_type.startswith('text/html')
+    return content_type.startswith('application/json') and any(
+        path.startswith(prefix) for prefix in settings.COMPRESSION_PATHS
+    )
+
+
+def compress(content, encoding, level=None):
+    if encoding == 'br':
+        return brotli.compress(content, quality=settings.COMPRESSION_BROTLI_QUALITY if level is None else level)
+    return gzip.compress(content, compresslevel=settings.COMPRESSION_GZIP_LEVEL if level is None else level, mtime=0)
+
+
+def precompress(content, content_type):
+    """{encoding: bytes} for every supported encoding that makes ``content`` smaller"""
+    if len(content) < settings.COMPRESSION_MIN_SIZE or not is_compressible(content_type):
+        return {}
+    levels = {'br': PRECOMPRESS_BROTLI_QUALITY, 'gzip': PRECOMPRESS_GZIP_LEVEL}
+    variants = {}
+    for encoding in supported_encodings():
+        compressed = compress(content, encoding, levels[encoding])
+        if len(compressed) < len(content):
+            variants[encoding] = compressed
+    return variants
+
+
+def _stream_compressor(encoding):
+    """(compress chunk, finish) functions for an incremental encoder"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        return (lambda chunk: compressor.process(chunk) + compressor.flush()), compressor.finish
+    # wbits 31: gzip container
+    compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+    return (lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)), compressor.flush
+
+
+def compress_stream(chunks, encoding):
+    process, finish = _stream_compressor(encoding)
+    for chunk in chunks:
+        data = process(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+async def compress_async_stream(chunks, encoding):
+    process, finish = _stream_compressor(encoding)
+    async for chunk in chunks:
+        data = process(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+def weaken_etag(response):
+    # The compressed bytes differ from the entity the strong ETag describes
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response['ETag'] = 'W/' + etag
+
+
+class CompressionMiddleware:
+    """Compress responses with the best encoding the client accepts"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not settings.COMPRESSION_ENABLED:
+            return response
+        if response.has_header('Content-Encoding') or not should_compress(request, response):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate_encoding(request)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compress_async_stream(response.streaming_content, encoding)
+            else:
+                response.streaming_content = compress_stream(response.streaming_content, encoding)
+            del response['Content-Length']
+        else:
+            if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+                return response
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        weaken_etag(response)
+        response['Content-Encoding'] = encoding
+        return response
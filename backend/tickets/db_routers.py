@@ -0,0 +1,91 @@
+"""
+Read-replica routing.
+
+Views opt in with ``@use_replica`` on their handler methods; only reads made
+inside those handlers go to the ``replica`` database, everything else
+(including all writes) stays on ``default``. A user who has just changed
+something is pinned to the primary for ``REPLICA_STICKY_SECONDS`` so they
+always read their own writes despite replication lag. Pins live in the cache,
+so settings refuse a replica without REDIS_URL outside DEBUG.
+"""
+import functools
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import permissions
+
+REPLICA_ALIAS = 'replica'
+PRIMARY_ALIAS = 'default'
+
+_reading_from_replica = ContextVar('reading_from_replica', default=False)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def _pin_key(user_id):
+    return f'replica-pin:{user_id}'
+
+
+def pin_to_primary(user):
+    cache.set(_pin_key(user.pk), True, settings.REPLICA_STICKY_SECONDS)
+
+
+def is_pinned_to_primary(user):
+    if not user or not user.is_authenticated:
+        return False
+    return bool(cache.get(_pin_key(user.pk)))
+
+
+def use_replica(handler):
+    """Route the reads of a view handler (get, list...) to the read replica"""
+    @functools.wraps(handler)
+    def wrapper(self, request, *args, **kwargs):
+        if not replica_configured() or is_pinned_to_primary(request.user):
+            return handler(self, request, *args, **kwargs)
+
+        token = _reading_from_replica.set(True)
+        try:
+            return handler(self, request, *args, **kwargs)
+        finally:
+            _reading_from_replica.reset(token)
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _reading_from_replica.get() and replica_configured():
+            return REPLICA_ALIAS
+        return PRIMARY_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Always explicit: objects read from the replica must still save to the primary
+        return PRIMARY_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica receives schema changes through replication
+        if db == REPLICA_ALIAS:
+            return False
+        return None
+
+
+class ReplicaStickinessMiddleware:
+    """Pin users to the primary database right after their own successful writes"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if request.method not in permissions.SAFE_METHODS and response.status_code < 400 and replica_configured():
+            # DRF copies the authenticated user back onto the Django request
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                pin_to_primary(user)
+        return response
@@ -1,8 +1,40 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
-from .models import Event
-from .serializers import EventSerializer
+from django.core import signing
+from django.http import HttpResponse, StreamingHttpResponse
+from .models import Event, EventDeletionJob
+from .serializers import EventSerializer, EventDeletionJobSerializer
+from .caching import bump_version, EVENTS
+from .jobs import start_event_deletion
+import json
+import time
+
+STREAM_TOKEN_SALT = 'tickets.event-deletion-stream'
+STREAM_TOKEN_MAX_AGE = 15 * 60 # Seconds; a client with an expired token fetches the job again
+
+
+def job_payload(job):
+    """The job plus a token for its progress stream, which browsers open with EventSource"""
+    return {**EventDeletionJobSerializer(job).data, 'stream_token': signing.dumps(job.id, salt=STREAM_TOKEN_SALT)}
+
+
+class IsAuthenticatedOrStreamToken(permissions.BasePermission):
+    """
+    JWT as everywhere else, or a ``token`` query parameter signed for this job:
+    EventSource cannot send an Authorization header.
+    """
+
+    def has_permission(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return True
+        token = request.query_params.get('token')
+        if not token or request.query_params.get('stream') not in ('1', 'true'):
+            return False
+        try:
+            return signing.loads(token, salt=STREAM_TOKEN_SALT, max_age=STREAM_TOKEN_MAX_AGE) == view.kwargs.get('id')
+        except signing.BadSignature:
+            return False
 
 class EventListCreateView(APIView):
     """List all events or create a new event"""
@@ -48,8 +80,9 @@ class EventDetailView(APIView):
             event = Event.objects.get(id=id)
             if event.is_active:
                 return Response({'error': 'Cannot delete active event'}, status=status.HTTP_400_BAD_REQUEST)
-            event.delete()
-            return Response({'message': 'Event deleted successfully'}, status=status.HTTP_204_NO_CONTENT)
+            # Tickets are deleted in batches in the background; poll or stream the job for progress
+            job = start_event_deletion(event)
+            return Response(job_payload(job), status=status.HTTP_202_ACCEPTED)
         except Event.DoesNotExist:
             return Response({'error': 'Event not found'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -61,6 +94,7 @@ class EventSetActiveView(APIView):
         try:
             # Deactivate all events
             Event.objects.all().update(is_active=False)
+            bump_version(EVENTS)
             
             # Activate the selected event
             event = Event.objects.get(id=id)
@@ -70,3 +104,49 @@ class EventSetActiveView(APIView):
             return Response({'message': 'Event set as active successfully'})
         except Event.DoesNotExist:
             return Response({'error': 'Event not found'}, status=status.HTTP_404_NOT_FOUND)
+
+class EventDeletionJobView(APIView):
+    """
+    Progress of a background event deletion; ?stream=1 streams it as server-sent events.
+    Browsers open the stream with ``EventSource(url + '?stream=1&token=' + job.stream_token)``,
+    using the token from this endpoint's JSON or the DELETE response.
+    Streams are capped at a few seconds because each one holds a sync gunicorn
+    worker; EventSource reconnects on its own (after ``retry``) and gets a 204,
+    which stops it, once it has already seen the finished job.
+    """
+    permission_classes = [IsAuthenticatedOrStreamToken]
+    stream_interval = 1 # Seconds between progress events
+    stream_max_seconds = 5
+    stream_retry_ms = 2000
+
+    def get(self, request, id):
+        try:
+            job = EventDeletionJob.objects.get(id=id)
+        except EventDeletionJob.DoesNotExist:
+            return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        if request.query_params.get('stream') not in ('1', 'true'):
+            return Response(job_payload(job))
+
+        if job.status not in EventDeletionJob.ACTIVE_STATUSES and request.headers.get('Last-Event-ID') == self.event_id(job):
+            return HttpResponse(status=status.HTTP_204_NO_CONTENT)
+
+        response = StreamingHttpResponse(self.stream_progress(job.id), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    @staticmethod
+    def event_id(job):
+        return f'{job.status}:{job.deleted_tickets}'
+
+    def stream_progress(self, job_id):
+        deadline = time.monotonic() + self.stream_max_seconds
+        yield f"retry: {self.stream_retry_ms}\n\n"
+        while True:
+            job = EventDeletionJob.objects.get(id=job_id)
+            data = EventDeletionJobSerializer(job).data
+            yield f"id: {self.event_id(job)}\nevent: progress\ndata: {json.dumps(data, default=str)}\n\n"
+            if job.status not in EventDeletionJob.ACTIVE_STATUSES or time.monotonic() + self.stream_interval > deadline:
+                return
+            time.sleep(self.stream_interval)
@@ -1,28 +1,160 @@
-from django.http import JsonResponse
+"""
+Liveness and readiness probes.
+
+``liveness`` only proves the worker can answer; it never touches a
+dependency, so a slow database cannot get a healthy process restarted.
+``readiness`` reports database round-trip latency, connection pool usage,
+migration state, the event deletion queue and this worker's request latency.
+It fails (503) past the configured thresholds, so load balancers drain an
+overloaded instance before it falls over.
+
+Checks run at most once per ``HEALTH_CHECK_CACHE_SECONDS`` per worker however
+often probes arrive; the migration check, which loads the migration graph,
+at most once per ``HEALTH_MIGRATIONS_CHECK_SECONDS``. Results are kept in
+process memory on purpose: readiness describes this instance, not the cluster.
+"""
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import connections
-from django.db.utils import OperationalError
+from django.db.migrations.executor import MigrationExecutor
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.cache import add_never_cache_headers
+
+from .models import EventDeletionJob
+from .throttling import recent_request_latency_ms
+
+STATUS_OK = 'ok'
+STATUS_DEGRADED = 'degraded'
+STATUS_FAILING = 'failing'
+_SEVERITY = {STATUS_OK: 0, STATUS_DEGRADED: 1, STATUS_FAILING: 2}
+
+_lock = threading.Lock()
+_cached = {'report': None, 'at': 0.0, 'migrations': None, 'migrations_at': 0.0}
+
+
+def _worst(*statuses):
+    return max(statuses, key=_SEVERITY.__getitem__, default=STATUS_OK)
+
+
+def _latency_status(latency_ms, warn_ms, fail_ms):
+    if latency_ms >= fail_ms:
+        return STATUS_FAILING
+    if latency_ms >= warn_ms:
+        return STATUS_DEGRADED
+    return STATUS_OK
+
+
+def check_database(alias):
+    connection = connections[alias]
+    started = time.perf_counter()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+    except Exception as e:
+        return {'status': STATUS_FAILING, 'error': str(e)}
+    latency_ms = (time.perf_counter() - started) * 1000
+    result = {
+        'status': _latency_status(latency_ms, settings.HEALTH_DB_LATENCY_WARN_MS, settings.HEALTH_DB_LATENCY_FAIL_MS),
+        'latency_ms': round(latency_ms, 2),
+    }
+
+    # Only set with DB_POOL_MODE=pool (psycopg3 pool)
+    pool = getattr(connection, 'pool', None)
+    if pool is not None:
+        stats = pool.get_stats()
+        in_use = stats.get('pool_size', 0) - stats.get('pool_available', 0)
+        waiting = stats.get('requests_waiting', 0)
+        result['pool'] = {
+            'in_use': in_use,
+            'max_size': pool.max_size,
+            'saturation': round(in_use / pool.max_size, 2) if pool.max_size else None,
+            'requests_waiting': waiting,
+        }
+        if waiting > settings.HEALTH_POOL_MAX_WAITING:
+            result['status'] = STATUS_FAILING
+        elif in_use >= pool.max_size:
+            result['status'] = _worst(result['status'], STATUS_DEGRADED)
+    return result
+
+
+def check_migrations(now):
+    if _cached['migrations'] is None or now - _cached['migrations_at'] >= settings.HEALTH_MIGRATIONS_CHECK_SECONDS:
+        try:
+            executor = MigrationExecutor(connections['default'])
+            pending = len(executor.migration_plan(executor.loader.graph.leaf_nodes()))
+            # A new release must not take traffic before its schema is in place
+            result = {'status': STATUS_FAILING if pending else STATUS_OK, 'pending': pending}
+        except Exception as e:
+            result = {'status': STATUS_FAILING, 'error': str(e)}
+        _cached['migrations'], _cached['migrations_at'] = result, now
+    return _cached['migrations']
+
+
+def check_queue():
+    """Event deletion jobs waiting or running; a stale heartbeat means a worker died mid-job"""
+    try:
+        active = EventDeletionJob.objects.filter(status__in=EventDeletionJob.ACTIVE_STATUSES)
+        depth = active.count()
+        stale_before = timezone.now() - timedelta(seconds=settings.EVENT_DELETION_STALE_SECONDS)
+        stale = active.filter(status=EventDeletionJob.STATUS_RUNNING, updated_at__lt=stale_before).count() if depth else 0
+    except Exception as e:
+        return {'status': STATUS_DEGRADED, 'error': str(e)}
+    # The queue never makes an instance unready; it only flags work for run_event_deletions
+    status = STATUS_DEGRADED if stale or depth > settings.HEALTH_QUEUE_WARN_DEPTH else STATUS_OK
+    return {'status': status, 'depth': depth, 'stale': stale}
+
+
+def check_request_latency():
+    latency_ms = recent_request_latency_ms()
+    if latency_ms is None:
+        return {'status': STATUS_OK, 'latency_ms': None}
+    # Same points at which load shedding starts rejecting anonymous and then normal traffic
+    target = settings.LOAD_SHED_TARGET_MS
+    return {'status': _latency_status(latency_ms, target, 2 * target), 'latency_ms': round(latency_ms, 2)}
+
+
+def readiness_report():
+    now = time.monotonic()
+    with _lock:
+        if _cached['report'] is not None and now - _cached['at'] < settings.HEALTH_CHECK_CACHE_SECONDS:
+            return _cached['report']
+
+        checks = {f'database:{alias}': check_database(alias) for alias in settings.DATABASES}
+        checks['migrations'] = check_migrations(now)
+        checks['event_deletion_queue'] = check_queue()
+        checks['request_latency'] = check_request_latency()
+        report = {
+            'status': _worst(*(check['status'] for check in checks.values())),
+            'checked_at': timezone.now().isoformat(),
+            'checks': checks,
+        }
+        _cached['report'], _cached['at'] = report, now
+        return report
+
+
+def liveness(request):
+    """The process is up and serving requests"""
+    response = JsonResponse({'status': 'alive'})
+    add_never_cache_headers(response)
+    return response
+
+
+def readiness(request):
+    """Whether this instance should receive traffic; 503 once a check is failing"""
+    report = readiness_report()
+    response = JsonResponse(report, status=503 if report['status'] == STATUS_FAILING else 200)
+    add_never_cache_headers(response)
+    return response
+
 
 def health_check(request):
     """
     Health check endpoint for deployment platforms.
-    Returns 200 OK if the application and database are healthy.
+    Kept for existing probes; same answer as the readiness endpoint.
     """
-    try:
-        # Check database connection
-        db_conn = connections['default']
-        db_conn.cursor()
-        
-        return JsonResponse({
-            'status': 'healthy',
-            'database': 'connected'
-        }, status=200)
-    except OperationalError:
-        return JsonResponse({
-            'status': 'unhealthy',
-            'database': 'disconnected'
-        }, status=503)
-    except Exception as e:
-        return JsonResponse({
-            'status': 'unhealthy',
-            'error': str(e)
-        }, status=503)
+    return readiness(request)
@@ -0,0 +1,57 @@
+"""
+Idempotent request handling.
+
+``run_idempotent`` inserts an ``IdempotencyKey`` row in the same transaction
+as the work it guards. The unique constraint on ``key`` serialises concurrent
+duplicates: the second insert waits for the first transaction and then fails,
+and the loser replays the stored response instead of doing the work again.
+"""
+import hashlib
+import json
+
+from django.db import IntegrityError, transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+REPLAY_HEADER = 'Idempotent-Replayed'
+
+
+class _AlreadyProcessed(Exception):
+    pass
+
+
+def request_fingerprint(data):
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def run_idempotent(key, endpoint, request_data, handler):
+    """
+    Run ``handler() -> (status_code, body)`` at most once per key and return
+    its Response; later calls with the same key get the stored response.
+    """
+    request_hash = request_fingerprint(request_data)
+    try:
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    record = IdempotencyKey.objects.create(key=key, endpoint=endpoint, request_hash=request_hash)
+            except IntegrityError:
+                raise _AlreadyProcessed
+            status_code, body = handler()
+            record.response_status = status_code
+            record.response_body = body
+            record.save(update_fields=['response_status', 'response_body'])
+    except _AlreadyProcessed:
+        return replay(key, request_hash)
+    return Response(body, status=status_code)
+
+
+def replay(key, request_hash):
+    record = IdempotencyKey.objects.filter(key=key).first()
+    if record is None or record.response_status is None:
+        return Response({'error': 'A request with this idempotency key is still in progress'}, status=status.HTTP_409_CONFLICT)
+    if record.request_hash != request_hash:
+        return Response({'error': 'Idempotency key was already used for a different request'}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+    return Response(record.response_body, status=record.response_status, headers={REPLAY_HEADER: 'true'})
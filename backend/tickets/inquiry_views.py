@@ -2,17 +2,33 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
 from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
 from .models import Inquiry
 from .inquiry_serializers import InquirySerializer
+from .db_routers import use_replica
+from .caching import get_unread_inquiry_count, invalidate_unread_inquiry_count
+from .throttling import IPThrottle
+
+def search_inquiries(inquiries, search):
+    return inquiries.filter(
+        Q(name__icontains=search) |
+        Q(email__icontains=search) |
+        Q(phone__icontains=search) |
+        Q(message__icontains=search)
+    )
 
 class InquiryCreateView(APIView):
     """Public endpoint for creating inquiries from contact form"""
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [IPThrottle]
+    throttle_scope = 'inquiry'
     
     def post(self, request):
         serializer = InquirySerializer(data=request.data)
         if serializer.is_valid():
             serializer.save()
+            invalidate_unread_inquiry_count()
             return Response({'message': 'Inquiry submitted successfully'}, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -20,21 +36,14 @@ class InquiryListView(APIView):
     """List all inquiries with pagination and search"""
     permission_classes = [permissions.IsAuthenticated]
     
+    @use_replica
     def get(self, request):
         inquiries = Inquiry.objects.all()
         
         # Search functionality
         search = request.query_params.get('search', '')
         if search:
-            inquiries = inquiries.filter(
-                name__icontains=search
-            ) | inquiries.filter(
-                email__icontains=search
-            ) | inquiries.filter(
-                phone__icontains=search
-            ) | inquiries.filter(
-                message__icontains=search
-            )
+            inquiries = search_inquiries(inquiries, search)
         
         # Pagination
         page_number = request.query_params.get('page', 1)
@@ -54,31 +63,71 @@ class InquiryUnreadCountView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
-        count = Inquiry.objects.filter(is_read=False).count()
-        return Response({'unread_count': count})
+        return Response({'unread_count': get_unread_inquiry_count()})
 
 class InquiryMarkReadView(APIView):
     """Mark inquiry as read"""
     permission_classes = [permissions.IsAuthenticated]
     
     def patch(self, request, id):
-        try:
-            inquiry = Inquiry.objects.get(id=id)
-            inquiry.is_read = True
-            inquiry.save()
-            return Response({'message': 'Marked as read'})
-        except Inquiry.DoesNotExist:
+        if not Inquiry.objects.filter(id=id).update(is_read=True):
             return Response({'error': 'Inquiry not found'}, status=status.HTTP_404_NOT_FOUND)
+        invalidate_unread_inquiry_count()
+        return Response({'message': 'Marked as read'})
 
 class InquiryMarkUnreadView(APIView):
     """Mark inquiry as unread"""
     permission_classes = [permissions.IsAuthenticated]
     
     def patch(self, request, id):
-        try:
-            inquiry = Inquiry.objects.get(id=id)
-            inquiry.is_read = False
-            inquiry.save()
-            return Response({'message': 'Marked as unread'})
-        except Inquiry.DoesNotExist:
+        if not Inquiry.objects.filter(id=id).update(is_read=False):
             return Response({'error': 'Inquiry not found'}, status=status.HTTP_404_NOT_FOUND)
+        invalidate_unread_inquiry_count()
+        return Response({'message': 'Marked as unread'})
+
+class InquiryBulkActionView(APIView):
+    """
+    Mark read, mark unread or delete many inquiries in one statement.
+
+    Body: {"action": "mark_read" | "mark_unread" | "delete"} plus either
+    "ids": [1, 2, ...] or "filter": {"is_read", "search", "before", "after"}.
+    An empty filter selects every inquiry.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        action = request.data.get('action')
+        ids = request.data.get('ids')
+        filters = request.data.get('filter')
+
+        if action not in ('mark_read', 'mark_unread', 'delete'):
+            return Response({'error': 'action must be mark_read, mark_unread or delete'}, status=status.HTTP_400_BAD_REQUEST)
+        if (ids is None) == (filters is None):
+            return Response({'error': 'Provide either ids or filter'}, status=status.HTTP_400_BAD_REQUEST)
+
+        inquiries = Inquiry.objects.all()
+        if ids is not None:
+            if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+                return Response({'error': 'ids must be a list of integers'}, status=status.HTTP_400_BAD_REQUEST)
+            inquiries = inquiries.filter(id__in=ids)
+        else:
+            if not isinstance(filters, dict):
+                return Response({'error': 'filter must be an object'}, status=status.HTTP_400_BAD_REQUEST)
+            if 'is_read' in filters:
+                inquiries = inquiries.filter(is_read=filters['is_read'] in (True, 1, 'true', '1'))
+            if filters.get('search'):
+                inquiries = search_inquiries(inquiries, filters['search'])
+            for key, lookup in (('before', 'created_at__lt'), ('after', 'created_at__gte')):
+                if filters.get(key):
+                    value = parse_datetime(str(filters[key]))
+                    if value is None:
+                        return Response({'error': f'Invalid {key} datetime'}, status=status.HTTP_400_BAD_REQUEST)
+                    inquiries = inquiries.filter(**{lookup: value})
+
+        if action == 'delete':
+            count, _ = inquiries.delete()
+        else:
+            count = inquiries.update(is_read=(action == 'mark_read'))
+
+        invalidate_unread_inquiry_count()
+        return Response({'action': action, 'count': count})
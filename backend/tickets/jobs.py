@@ -0,0 +1,124 @@
+"""
+Background event deletion.
+
+Deleting an event used to cascade through every ticket in one request and one
+transaction. ``start_event_deletion`` instead records an ``EventDeletionJob``
+and runs it in a background thread that deletes tickets, and then the
+archived tickets of an archived event, in batches of ``batch_size``, each in
+its own short transaction, recording progress as it goes. Every batch re-selects the tickets that are left, so a job interrupted by
+a crash or worker restart simply continues where it stopped when
+``resume_stale_jobs`` (``manage.py run_event_deletions``) or a repeated DELETE
+picks it up again.
+"""
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .caching import bump_version, bump_tickets, EVENTS
+from .models import ArchivedTicket, Event, EventDeletionJob, Ticket
+
+
+def _stale_before():
+    return timezone.now() - timedelta(seconds=settings.EVENT_DELETION_STALE_SECONDS)
+
+
+def _claimable():
+    # Pending, failed, or running without a heartbeat (its worker died)
+    return (
+        Q(status__in=[EventDeletionJob.STATUS_PENDING, EventDeletionJob.STATUS_FAILED]) |
+        Q(status=EventDeletionJob.STATUS_RUNNING, updated_at__lt=_stale_before())
+    )
+
+
+def bulk_delete_tickets(queryset):
+    """
+    Delete tickets with a single DELETE statement. Nothing references Ticket,
+    so Django's collector (which loads every row to send per-row signals) is
+    skipped; the response cache is invalidated once, for the deleted ids only.
+    Callers pass bounded batches.
+    """
+    ids = list(queryset.values_list('id', flat=True))
+    if not ids:
+        return 0
+    batch = Ticket.objects.filter(id__in=ids)
+    deleted = batch._raw_delete(batch.db)
+    transaction.on_commit(lambda: bump_tickets(ids))
+    return deleted
+
+
+def start_event_deletion(event):
+    """Return the event's unfinished deletion job, creating and starting one if needed"""
+    job = EventDeletionJob.objects.filter(
+        event=event, status__in=EventDeletionJob.ACTIVE_STATUSES + [EventDeletionJob.STATUS_FAILED]
+    ).first()
+    if job is None:
+        job = EventDeletionJob.objects.create(
+            event=event,
+            event_name=event.name,
+            batch_size=settings.EVENT_DELETION_BATCH_SIZE,
+            total_tickets=event.tickets.count() + event.archived_tickets.count(),
+        )
+    transaction.on_commit(lambda: run_in_background(job.id))
+    return job
+
+
+def run_in_background(job_id):
+    thread = threading.Thread(target=run_event_deletion, args=(job_id,), daemon=True, name=f'event-deletion-{job_id}')
+    thread.start()
+    return thread
+
+
+def resume_stale_jobs():
+    """Run every job that is pending, failed or abandoned; returns the ids run"""
+    job_ids = list(EventDeletionJob.objects.filter(_claimable()).values_list('id', flat=True))
+    for job_id in job_ids:
+        run_event_deletion(job_id)
+    return job_ids
+
+
+def run_event_deletion(job_id):
+    try:
+        # Claim the job atomically so two runners never work on it at once
+        claimed = EventDeletionJob.objects.filter(_claimable(), id=job_id).update(
+            status=EventDeletionJob.STATUS_RUNNING, error='', updated_at=timezone.now()
+        )
+        if not claimed:
+            return
+
+        job = EventDeletionJob.objects.get(id=job_id)
+        # Archived tickets too: left to the event's cascade they would go in one unbatched DELETE
+        for model in (Ticket, ArchivedTicket):
+            while job.event_id is not None:
+                with transaction.atomic():
+                    ids = list(
+                        model.objects.filter(event_id=job.event_id)
+                        .values_list('id', flat=True)[:job.batch_size]
+                    )
+                    if not ids:
+                        break
+                    batch = model.objects.filter(id__in=ids)
+                    deleted = bulk_delete_tickets(batch) if model is Ticket else batch._raw_delete(batch.db)
+                EventDeletionJob.objects.filter(id=job.id).update(
+                    deleted_tickets=F('deleted_tickets') + deleted, updated_at=timezone.now()
+                )
+
+        with transaction.atomic():
+            if job.event_id is not None:
+                Event.objects.filter(id=job.event_id).delete()
+            EventDeletionJob.objects.filter(id=job.id).update(
+                status=EventDeletionJob.STATUS_COMPLETED, finished_at=timezone.now()
+            )
+        bump_version(EVENTS)
+    except Exception as e:
+        print(f"Event deletion job {job_id} failed: {e}")
+        EventDeletionJob.objects.filter(id=job_id).update(
+            status=EventDeletionJob.STATUS_FAILED, error=str(e)
+        )
+    finally:
+        # Background threads own their connections
+        if threading.current_thread() is not threading.main_thread():
+            connections.close_all()
@@ -0,0 +1,80 @@
+import threading
+
+from django.conf import settings
+from django.core.mail import send_mail
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status, permissions
+from .models import Ticket, Event, normalize_email, normalize_phone
+from .throttling import IPThrottle, LookupIdentifierThrottle
+
+# Never id or short_code: they are the QR and manual check-in credentials, and only go by email
+LOOKUP_FIELDS = ('name', 'checked_in', 'created_at')
+RESEND_MESSAGE = 'If tickets match these details, they have been sent to the email address used at purchase.'
+SENT_MESSAGE = 'Your ticket codes have been sent to the email address used at purchase.'
+
+
+def send_ticket_email(email, event_name, tickets):
+    lines = [f"- {ticket['name']}: {ticket['short_code']}" for ticket in tickets]
+    send_mail(
+        subject=f'Your {event_name} tickets',
+        message=(
+            f"Here are your tickets for {event_name}. Show a code at the gate to check in.\n\n"
+            + '\n'.join(lines)
+        ),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient_list=[email],
+        fail_silently=True,
+    )
+
+
+def resend_tickets(event_name, rows):
+    """Mail each purchase's codes to the address it was made with, off the request thread"""
+    # A phone number can match purchases made with different email addresses
+    by_email = {}
+    for row in rows:
+        by_email.setdefault(row['email'].strip(), []).append(row)
+    for address, tickets in by_email.items():
+        threading.Thread(target=send_ticket_email, args=(address, event_name, tickets), daemon=True).start()
+
+
+class TicketLookupView(APIView):
+    """
+    Public ticket lookup for the active event.
+    Ticket codes are only ever sent to the email address on file. Email and
+    phone number together also list the matching tickets (without codes);
+    either one alone gets the same reply whether or not anything matched.
+    """
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+    throttle_classes = [IPThrottle, LookupIdentifierThrottle]
+    throttle_scope = 'ticket_lookup'
+
+    def post(self, request):
+        email = normalize_email(request.data.get('email'))
+        phone = normalize_phone(request.data.get('phone_number'))
+        if not email and not phone:
+            return Response({'error': 'Provide an email or phone number'}, status=status.HTTP_400_BAD_REQUEST)
+
+        event = Event.objects.filter(is_active=True).first()
+        if not event:
+            return Response({'error': 'No active event'}, status=status.HTTP_404_NOT_FOUND)
+
+        # Each filter is a probe of the (event, *_normalized) indexes
+        tickets = Ticket.objects.filter(event=event, verified=True)
+        if email:
+            tickets = tickets.filter(email_normalized=email)
+        if phone:
+            tickets = tickets.filter(phone_normalized=phone)
+
+        rows = list(tickets.order_by('created_at').values('email', 'short_code', *LOOKUP_FIELDS))
+        resend_tickets(event.name, rows)
+        if email and phone:
+            if not rows:
+                return Response({'error': 'No tickets match these details'}, status=status.HTTP_404_NOT_FOUND)
+            return Response({
+                'event': event.name,
+                'tickets': [{field: row[field] for field in LOOKUP_FIELDS} for row in rows],
+                'message': SENT_MESSAGE,
+            })
+        return Response({'message': RESEND_MESSAGE}, status=status.HTTP_202_ACCEPTED)
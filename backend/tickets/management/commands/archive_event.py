@@ -0,0 +1,94 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, Q
+
+from tickets.caching import bump_version, EVENTS, TICKETS
+from tickets.jobs import bulk_delete_tickets
+from tickets.models import ArchivedTicket, Event, EventSummary, Ticket
+
+# Columns copied from the tickets table; ArchivedTicket uses the same names
+COLUMNS = ['id', 'event_id', 'name', 'email', 'phone_number', 'paystack_reference',
+           'verified', 'checked_in', 'created_at', 'short_code']
+
+
+class Command(BaseCommand):
+    help = (
+        "Move the tickets of past events out of the hot tickets table into ArchivedTicket, "
+        "in batches of one INSERT ... SELECT and one DELETE per transaction, then store the "
+        "event's totals in EventSummary for the analytics views. Safe to re-run after an "
+        "interruption: each batch moves completely or not at all."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_ids', nargs='*', type=int)
+        parser.add_argument('--all-inactive', action='store_true', help='Archive every inactive event not archived yet')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--pause', type=float, default=0.05, help='Seconds to sleep between batches')
+        parser.add_argument('--dry-run', action='store_true', help='Report ticket counts without moving anything')
+
+    def handle(self, *args, **options):
+        if options['all_inactive']:
+            events = list(Event.objects.filter(is_active=False, is_archived=False).order_by('id'))
+        elif options['event_ids']:
+            events = list(Event.objects.filter(id__in=options['event_ids']).order_by('id'))
+            missing = set(options['event_ids']) - {event.id for event in events}
+            if missing:
+                raise CommandError(f"Events not found: {', '.join(map(str, sorted(missing)))}")
+        else:
+            raise CommandError('Pass event ids or --all-inactive')
+
+        for event in events:
+            if event.is_active:
+                raise CommandError(f"Event {event.id} ({event.name}) is active; set another event active first")
+
+        for event in events:
+            if options['dry_run']:
+                pending = Ticket.objects.filter(event=event).count()
+                self.stdout.write(json.dumps({'event': event.id, 'name': event.name, 'tickets_to_move': pending}))
+                continue
+            self.stdout.write(json.dumps(self.archive(event, options['batch_size'], options['pause'])))
+
+    def archive(self, event, batch_size, pause):
+        started = time.monotonic()
+        moved = 0
+        column_list = ', '.join(connection.ops.quote_name(column) for column in COLUMNS)
+        source, target = Ticket._meta.db_table, ArchivedTicket._meta.db_table
+
+        while True:
+            with transaction.atomic():
+                ids = list(Ticket.objects.filter(event=event).values_list('id', flat=True)[:batch_size])
+                if not ids:
+                    break
+                batch = Ticket.objects.filter(id__in=ids)
+                # The ids are compiled by the ORM so the UUID format matches the backend
+                where_sql, params = batch.values('id').query.sql_with_params()
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f'INSERT INTO {target} ({column_list}) SELECT {column_list} FROM {source} '
+                        f'WHERE id IN ({where_sql})',
+                        params,
+                    )
+                moved += bulk_delete_tickets(batch)
+            if pause:
+                time.sleep(pause)
+
+        with transaction.atomic():
+            totals = ArchivedTicket.objects.filter(event=event).aggregate(
+                tickets_sold=Count('id'),
+                verified=Count('id', filter=Q(verified=True)),
+                checked_in=Count('id', filter=Q(checked_in=True)),
+            )
+            EventSummary.objects.update_or_create(event=event, defaults=totals)
+            Event.objects.filter(id=event.id).update(is_archived=True)
+            transaction.on_commit(lambda: bump_version(EVENTS, TICKETS))
+
+        return {
+            'event': event.id,
+            'name': event.name,
+            'tickets_moved': moved,
+            **totals,
+            'seconds': round(time.monotonic() - started, 2),
+        }
@@ -0,0 +1,71 @@
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tickets.compression import compress, supported_encodings
+from tickets.renderers import ORJSONRenderer
+
+
+def sample_payload(rows):
+    """A transactions-list page of ``rows`` tickets, rendered like the API renders it"""
+    now = timezone.now()
+    results = [
+        {
+            'id': str(uuid.uuid4()),
+            'event': 1,
+            'name': f'Attendee {i}',
+            'email': f'attendee{i}@example.com',
+            'phone_number': f'024{i:07d}',
+            'paystack_reference': f'T{uuid.uuid4().hex[:15]}',
+            'verified': i % 4 != 0,
+            'checked_in': i % 3 == 0,
+            'created_at': (now - timedelta(minutes=i)).isoformat(),
+            'short_code': uuid.uuid4().hex[:8].upper(),
+        }
+        for i in range(rows)
+    ]
+    return ORJSONRenderer().render({'count': rows, 'next': None, 'previous': None, 'results': results})
+
+
+class Command(BaseCommand):
+    help = (
+        "Show the CPU-versus-bytes tradeoff of gzip levels and brotli qualities for API "
+        "payloads of different sizes, with the transfer time each saves on a slow mobile link."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', default='10,100,1000,10000', help='Comma separated payload sizes in ticket rows')
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--bandwidth-kbps', type=float, default=1000, help='Link speed used for the transfer estimate')
+
+    def handle(self, *args, **options):
+        levels = [('identity', None), ('gzip', 1), ('gzip', 6), ('gzip', 9)]
+        if 'br' in supported_encodings():
+            levels += [('br', 1), ('br', 4), ('br', 9), ('br', 11)]
+        else:
+            self.stdout.write('brotli is not installed (pip install brotli); showing gzip only')
+
+        bytes_per_ms = options['bandwidth_kbps'] * 1000 / 8 / 1000
+        self.stdout.write(
+            f"{'rows':>7}{'encoding':>12}{'bytes':>11}{'ratio':>8}{'cpu ms':>9}{'xfer ms':>10}{'total ms':>10}"
+        )
+        for rows in (int(r) for r in options['rows'].split(',') if r.strip()):
+            payload = sample_payload(rows)
+            for encoding, level in levels:
+                if encoding == 'identity':
+                    size, cpu_ms = len(payload), 0.0
+                else:
+                    iterations = max(1, options['iterations'] // (1 + rows // 1000))
+                    start = time.perf_counter()
+                    for _ in range(iterations):
+                        size = len(compress(payload, encoding, level))
+                    cpu_ms = (time.perf_counter() - start) / iterations * 1000
+                transfer_ms = size / bytes_per_ms
+                label = encoding if level is None else f'{encoding}-{level}'
+                self.stdout.write(
+                    f"{rows:>7}{label:>12}{size:>11}{len(payload) / size:>8.1f}{cpu_ms:>9.2f}"
+                    f"{transfer_ms:>10.1f}{cpu_ms + transfer_ms:>10.1f}"
+                )
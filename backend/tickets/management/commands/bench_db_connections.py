@@ -0,0 +1,90 @@
+import statistics
+import time
+
+import dj_database_url
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import connections
+
+from tickets.models import Event
+
+MODES = ('none', 'persistent', 'pool')
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare per-request database latency with no connection reuse, persistent "
+        "connections and a psycopg3 pool. Point --database-url at a local Postgres."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database-url', help='Database to benchmark (defaults to the configured default database)')
+        parser.add_argument('--requests', type=int, default=200, help='Simulated requests per mode')
+        parser.add_argument('--modes', default=','.join(MODES), help='Comma separated subset of: none, persistent, pool')
+
+    def handle(self, *args, **options):
+        if options['database_url']:
+            base = dj_database_url.parse(options['database_url'])
+        else:
+            base = dict(settings.DATABASES['default'])
+
+        modes = [m.strip() for m in options['modes'].split(',') if m.strip()]
+        for mode in modes:
+            if mode not in MODES:
+                raise CommandError(f"Unknown mode '{mode}'")
+
+        self.stdout.write(f"{'mode':<12}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+        for mode in modes:
+            alias = f'bench_{mode}'
+            try:
+                self.configure_alias(alias, base, mode)
+            except CommandError as e:
+                self.stdout.write(f"{mode:<12}skipped: {e}")
+                continue
+            try:
+                timings = self.run_requests(alias, options['requests'])
+            finally:
+                connections[alias].close()
+                if mode == 'pool':
+                    connections[alias].close_pool()
+
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            self.stdout.write(
+                f"{mode:<12}{statistics.mean(timings):>10.2f}{statistics.median(timings):>10.2f}"
+                f"{p95:>10.2f}{timings[-1]:>10.2f}"
+            )
+
+    def configure_alias(self, alias, base, mode):
+        db = {key: value for key, value in base.items() if key not in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS')}
+        db['OPTIONS'] = {key: value for key, value in base.get('OPTIONS', {}).items() if key != 'pool'}
+
+        if mode == 'persistent':
+            db['CONN_MAX_AGE'] = 600
+            db['CONN_HEALTH_CHECKS'] = True
+        elif mode == 'pool':
+            if db.get('ENGINE') != 'django.db.backends.postgresql':
+                raise CommandError('pool mode needs a Postgres database')
+            try:
+                import psycopg_pool  # noqa: F401
+            except ImportError:
+                raise CommandError('psycopg_pool is not installed')
+            db['CONN_MAX_AGE'] = 0
+            db['OPTIONS']['pool'] = {'min_size': 1, 'max_size': 4}
+        else:
+            db['CONN_MAX_AGE'] = 0
+
+        configured = connections.configure_settings({'default': dict(base), alias: db})
+        connections.settings[alias] = configured[alias]
+
+    def run_requests(self, alias, count):
+        timings = []
+        for _ in range(count):
+            # Mirror the request cycle so close_old_connections applies CONN_MAX_AGE
+            start = time.perf_counter()
+            request_started.send(sender=self.__class__)
+            Event.objects.using(alias).filter(is_active=True).first()
+            request_finished.send(sender=self.__class__)
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
@@ -0,0 +1,75 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from tickets.models import Event, Ticket
+from tickets.renderers import ORJSONRenderer
+from tickets.serializers import TicketSerializer, values_queryset, values_rows
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-row cost of producing TicketSerializer output: ModelSerializer "
+        "with the stdlib JSON renderer versus values() rows with the orjson renderer. "
+        "Sample tickets are created inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100, help='Tickets per response (page size)')
+        parser.add_argument('--iterations', type=int, default=50)
+
+    def handle(self, *args, **options):
+        rows, iterations = options['rows'], options['iterations']
+        try:
+            with transaction.atomic():
+                self.run(rows, iterations)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, rows, iterations):
+        event = Event.objects.create(name='Serialization benchmark')
+        reference = f'bench-{uuid.uuid4().hex[:12]}'
+        Ticket.objects.bulk_create([
+            Ticket(
+                event=event, name=f'Attendee {i}', email=f'attendee{i}@example.com',
+                phone_number='0240000000', paystack_reference=reference,
+                verified=True, short_code=f'B{i:07d}',
+            )
+            for i in range(rows)
+        ])
+        queryset = Ticket.objects.filter(event=event).order_by('-created_at')
+
+        def serializer_data():
+            return TicketSerializer(queryset, many=True).data
+
+        def fast_data():
+            return values_rows(values_queryset(queryset, TicketSerializer), TicketSerializer)
+
+        stdlib, fast = JSONRenderer(), ORJSONRenderer()
+        if stdlib.render(serializer_data()) != fast.render(fast_data()):
+            self.stderr.write('Warning: fast path output differs from TicketSerializer output')
+
+        cases = [
+            ('ModelSerializer + JSONRenderer (before)', serializer_data, stdlib),
+            ('ModelSerializer + ORJSONRenderer', serializer_data, fast),
+            ('values() rows + JSONRenderer', fast_data, stdlib),
+            ('values() rows + ORJSONRenderer (after)', fast_data, fast),
+        ]
+        self.stdout.write(f"{rows} rows x {iterations} iterations")
+        self.stdout.write(f"{'path':<42}{'us/row':>10}{'ms/response':>14}")
+        for label, build, renderer in cases:
+            start = time.perf_counter()
+            for _ in range(iterations):
+                renderer.render(build())
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"{label:<42}{elapsed / (iterations * rows) * 1e6:>10.1f}{elapsed / iterations * 1000:>14.2f}"
+            )
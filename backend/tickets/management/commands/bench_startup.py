@@ -0,0 +1,83 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Runs in a fresh interpreter so every measurement is a cold start
+PROBE = '''
+import json, time
+start = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from wakyefest_backend.wsgi import application
+wsgi = time.perf_counter()
+from wakyefest_backend.startup import warm_up
+if WARM_UP:
+    warm_up()
+warmed = time.perf_counter()
+from django.test import Client
+client = Client(HTTP_HOST='localhost')
+client.get('/ping/')
+first = time.perf_counter()
+client.get('/api/settings/')
+api = time.perf_counter()
+client.get('/?format=openapi')
+schema = time.perf_counter()
+print(json.dumps({
+    'django.setup': setup - start,
+    'wsgi import': wsgi - setup,
+    'warm-up': warmed - wsgi,
+    'first request (/ping/)': first - warmed,
+    'first API request': api - first,
+    'OpenAPI schema': schema - api,
+}))
+'''
+
+
+class Command(BaseCommand):
+    help = "Measure cold-start time of the Django process, with and without the warm-up hook and cached schema."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+
+    def handle(self, *args, **options):
+        schema_file = settings.OPENAPI_SCHEMA_FILE
+        has_schema = bool(schema_file) and os.path.isfile(schema_file)
+        if not has_schema:
+            self.stdout.write(f"No cached schema at {schema_file!r}; run generate_swagger to compare both modes.")
+
+        scenarios = [('default', False, '')]
+        if has_schema:
+            scenarios.append(('cached schema', False, schema_file))
+            scenarios.append(('cached schema + warm-up', True, schema_file))
+
+        for label, warm, schema in scenarios:
+            runs = [self.probe(warm, schema) for _ in range(options['runs'])]
+            self.stdout.write(f"\n{label} (median of {len(runs)} runs, ms)")
+            for step in runs[0]:
+                if step == '_wall' or (step == 'warm-up' and not warm):
+                    continue
+                median = statistics.median(run[step] for run in runs) * 1000
+                self.stdout.write(f"  {step:<28}{median:>10.1f}")
+            total = statistics.median(run['_wall'] for run in runs) * 1000
+            self.stdout.write(f"  {'process wall clock':<28}{total:>10.1f}")
+
+    def probe(self, warm, schema):
+        env = dict(os.environ, OPENAPI_SCHEMA_FILE=schema)
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'wakyefest_backend.settings')
+        code = f'WARM_UP = {warm}\n' + PROBE
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, '-c', code], env=env, cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout
+        wall = time.perf_counter() - start
+        result = json.loads(output.strip().splitlines()[-1])
+        result['_wall'] = wall
+        return result
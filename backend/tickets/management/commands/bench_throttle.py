@@ -0,0 +1,78 @@
+import statistics
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+
+from tickets.throttling import IPThrottle, LoadSheddingMiddleware, ReferenceThrottle
+
+
+class BenchView:
+    throttle_scope = 'bench'
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the per-request overhead of the token-bucket throttles and the load-shedding "
+        "middleware against the configured cache (set REDIS_URL to measure the shared path)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--clients', type=int, default=100, help='Distinct IPs / references to spread requests over')
+
+    def handle(self, *args, **options):
+        total, clients = options['requests'], options['clients']
+        factory = RequestFactory()
+        prefix = uuid.uuid4().hex[:8]
+        requests = []
+        for i in range(total):
+            client = i % clients
+            request = factory.post(
+                '/api/verify-payment/', {'reference': f'{prefix}-{client}'},
+                content_type='application/json', REMOTE_ADDR=f'10.{client // 65536 % 256}.{client // 256 % 256}.{client % 256}',
+            )
+            requests.append(Request(request, parsers=[JSONParser()]))
+
+        rates = dict(settings.REST_FRAMEWORK.get('DEFAULT_THROTTLE_RATES', {}))
+        # High enough that every request is allowed: we measure the check, not rejections
+        rates.update({'bench': f'{total}/min', 'bench_reference': f'{total}/min'})
+        view = BenchView()
+        self.stdout.write(f"cache backend: {settings.CACHES['default']['BACKEND']}")
+        self.stdout.write(f"{'path':<28}{'mean us':>10}{'p50 us':>10}{'p95 us':>10}")
+
+        with override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': rates}):
+            for label, throttle_classes in [
+                ('per-IP bucket', [IPThrottle]),
+                ('per-IP + per-reference', [IPThrottle, ReferenceThrottle]),
+            ]:
+                timings = []
+                for request in requests:
+                    start = time.perf_counter()
+                    for throttle_class in throttle_classes:
+                        throttle_class().allow_request(request, view)
+                    timings.append((time.perf_counter() - start) * 1e6)
+                self.report(label, timings)
+
+        middleware = LoadSheddingMiddleware(lambda request: HttpResponse())
+        timings = []
+        for request in requests:
+            start = time.perf_counter()
+            middleware(request._request)
+            timings.append((time.perf_counter() - start) * 1e6)
+        self.report('load-shedding middleware', timings)
+
+        cache.delete_many([f'throttle:bench{suffix}:{key}' for suffix in ('', '_reference')
+                           for key in {IPThrottle().get_ident(r) for r in requests} | {r.data['reference'] for r in requests}])
+
+    def report(self, label, timings):
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(f"{label:<28}{statistics.mean(timings):>10.1f}{statistics.median(timings):>10.1f}{p95:>10.1f}")
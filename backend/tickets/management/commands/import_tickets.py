@@ -0,0 +1,236 @@
+import csv
+import hashlib
+import io
+import json
+import os
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Case, When, Value, DateTimeField
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from tickets.caching import bump_version, TICKETS
+from tickets.models import Event, Ticket, allocate_short_codes, normalize_email, normalize_phone
+
+TRUE_VALUES = ('1', 'true', 'yes', 'y', 't')
+DEDUPE_FIELDS = ('paystack_reference', 'email', 'name')
+# Columns written by the import, in COPY order
+COLUMNS = ['id', 'event_id', 'name', 'email', 'phone_number', 'paystack_reference',
+           'verified', 'checked_in', 'created_at', 'short_code', 'email_normalized', 'phone_normalized']
+
+
+def parse_bool(value, default):
+    if value is None or value == '':
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import box-office or legacy tickets from CSV or NDJSON. Fields: name, email, "
+        "phone_number, paystack_reference, verified, checked_in, created_at, event_id (all but "
+        "name and email optional). Rows already present (same reference, email and name) are "
+        "skipped; rows without a reference get one derived from their content. Postgres loads each batch with COPY into a staging table and merges it with "
+        "one INSERT ... SELECT; other databases use bulk_create. Progress is checkpointed after "
+        "every batch so an interrupted import can be resumed with --resume."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help='Defaults to the file extension')
+        parser.add_argument('--event', type=int, help='Event id for rows without event_id (default: active event)')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--unverified', action='store_true', help='Import rows without a verified value as pending')
+        parser.add_argument('--reference-prefix', default='BOX', help='Prefix for generated references of rows without one')
+        parser.add_argument('--checkpoint', help='Checkpoint file (default: <path>.checkpoint)')
+        parser.add_argument('--resume', action='store_true', help='Skip rows already imported according to the checkpoint')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.isfile(path):
+            raise CommandError(f'{path} does not exist')
+        file_format = options['format'] or ('ndjson' if path.endswith(('.ndjson', '.jsonl')) else 'csv')
+        checkpoint_path = options['checkpoint'] or f'{path}.checkpoint'
+
+        if options['event']:
+            default_event = Event.objects.filter(id=options['event']).first()
+            if default_event is None:
+                raise CommandError(f"Event {options['event']} not found")
+        else:
+            default_event = Event.objects.filter(is_active=True).first()
+        self.default_event_id = default_event.id if default_event else None
+        self.event_ids = set(Event.objects.values_list('id', flat=True))
+        self.default_verified = not options['unverified']
+        self.reference_prefix = options['reference_prefix']
+        self.use_copy = connection.vendor == 'postgresql'
+
+        self.stats = {'rows_read': 0, 'imported': 0, 'duplicates': 0, 'invalid': 0}
+        start_row = 0
+        if options['resume'] and os.path.isfile(checkpoint_path):
+            with open(checkpoint_path) as checkpoint:
+                saved = json.load(checkpoint)
+            start_row = saved['rows_done']
+            self.stats.update(saved['stats'])
+            self.stdout.write(f'Resuming after row {start_row}')
+
+        self.start_row = start_row
+        self.seen = set()
+        started = time.monotonic()
+        rows_done = start_row
+        batch = []
+        for index, record in enumerate(self.read_records(path, file_format)):
+            if index < start_row:
+                continue
+            self.stats['rows_read'] += 1
+            batch.append(record)
+            if len(batch) >= options['batch_size']:
+                rows_done = index + 1
+                self.flush(batch, rows_done, checkpoint_path, started)
+                batch = []
+        if batch:
+            rows_done += len(batch)
+            self.flush(batch, rows_done, checkpoint_path, started)
+
+        bump_version(TICKETS)
+        elapsed = time.monotonic() - started
+        self.stats['seconds'] = round(elapsed, 2)
+        self.stats['rows_per_second'] = round((rows_done - start_row) / elapsed, 1) if elapsed else None
+        self.stats['method'] = 'copy' if self.use_copy else 'bulk_create'
+        self.stdout.write(json.dumps(self.stats))
+        if os.path.isfile(checkpoint_path):
+            os.remove(checkpoint_path)
+
+    def read_records(self, path, file_format):
+        with open(path, newline='', encoding='utf-8-sig') as source:
+            if file_format == 'csv':
+                yield from csv.DictReader(source)
+            else:
+                for line in source:
+                    if line.strip():
+                        yield json.loads(line)
+
+    def flush(self, records, rows_done, checkpoint_path, started):
+        rows = self.prepare(records)
+        with transaction.atomic():
+            if rows:
+                if self.use_copy:
+                    self.load_with_copy(rows)
+                else:
+                    self.load_with_bulk_create(rows)
+        with open(checkpoint_path, 'w') as checkpoint:
+            json.dump({'rows_done': rows_done, 'stats': self.stats}, checkpoint)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f"{rows_done} rows processed, {self.stats['imported']} imported "
+            f"({(rows_done - self.start_row) / elapsed:.0f} rows/s)"
+        )
+
+    def prepare(self, records):
+        """Validate, fill defaults, drop in-file and existing duplicates and allocate short codes"""
+        rows = []
+        for record in records:
+            name = (record.get('name') or '').strip()
+            email = (record.get('email') or '').strip()
+            if not name or not email:
+                self.stats['invalid'] += 1
+                continue
+            event_id = self.default_event_id
+            if record.get('event_id'):
+                # A malformed or unknown event_id would otherwise abort the whole batch
+                try:
+                    event_id = int(record['event_id'])
+                except (TypeError, ValueError):
+                    event_id = None
+                if event_id not in self.event_ids:
+                    self.stats['invalid'] += 1
+                    continue
+            phone_number = (record.get('phone_number') or '').strip()
+            raw_created_at = record.get('created_at') or ''
+            reference = (record.get('paystack_reference') or '').strip()
+            if not reference:
+                # Derived from the row so re-importing the same file dedupes it
+                digest = hashlib.sha1(f'{name}|{email}|{phone_number}|{raw_created_at}'.encode()).hexdigest()
+                reference = f'{self.reference_prefix}-{digest[:16]}'
+            created_at = parse_datetime(str(raw_created_at)) if raw_created_at else None
+            if created_at is not None and timezone.is_naive(created_at):
+                created_at = timezone.make_aware(created_at)
+
+            row = {
+                'id': uuid.uuid4(),
+                'event_id': event_id,
+                'name': name,
+                'email': email,
+                'phone_number': phone_number,
+                'paystack_reference': reference,
+                'verified': parse_bool(record.get('verified'), self.default_verified),
+                'checked_in': parse_bool(record.get('checked_in'), False),
+                'created_at': created_at or timezone.now(),
+                'email_normalized': normalize_email(email),
+                'phone_normalized': normalize_phone(phone_number),
+            }
+            key = tuple(row[field] for field in DEDUPE_FIELDS)
+            if key in self.seen:
+                self.stats['duplicates'] += 1
+                continue
+            self.seen.add(key)
+            rows.append(row)
+
+        if not self.use_copy:
+            # Postgres filters existing rows inside the merge statement instead
+            references = {row['paystack_reference'] for row in rows}
+            existing = set(
+                Ticket.objects.filter(paystack_reference__in=references).values_list(*DEDUPE_FIELDS)
+            )
+            fresh = [row for row in rows if tuple(row[f] for f in DEDUPE_FIELDS) not in existing]
+            self.stats['duplicates'] += len(rows) - len(fresh)
+            rows = fresh
+
+        for row, code in zip(rows, allocate_short_codes(len(rows))):
+            row['short_code'] = code
+        return rows
+
+    def load_with_bulk_create(self, rows):
+        tickets = Ticket.objects.bulk_create([Ticket(**row) for row in rows])
+        # auto_now_add overwrote created_at; restore the source timestamps in one UPDATE
+        Ticket.objects.filter(id__in=[row['id'] for row in rows]).update(created_at=Case(
+            *[When(id=row['id'], then=Value(row['created_at'])) for row in rows],
+            output_field=DateTimeField(),
+        ))
+        self.stats['imported'] += len(tickets)
+
+    def load_with_copy(self, rows):
+        table = Ticket._meta.db_table
+        column_list = ', '.join(COLUMNS)
+        dedupe = ' AND '.join(f't.{field} = s.{field}' for field in DEDUPE_FIELDS)
+        with connection.cursor() as cursor:
+            cursor.execute(f'CREATE TEMP TABLE tickets_import_staging (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP')
+            raw = cursor.cursor
+            copy_sql = f'COPY tickets_import_staging ({column_list}) FROM STDIN'
+            if hasattr(raw, 'copy'):
+                # psycopg 3
+                with raw.copy(copy_sql) as copy:
+                    for row in rows:
+                        copy.write_row([row[column] for column in COLUMNS])
+            else:
+                # psycopg2
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                for row in rows:
+                    writer.writerow(['' if row[c] is None else row[c] for c in COLUMNS])
+                buffer.seek(0)
+                raw.copy_expert(f"{copy_sql} WITH (FORMAT csv)", buffer)
+
+            cursor.execute(
+                f'INSERT INTO {table} ({column_list}) '
+                f'SELECT {column_list} FROM tickets_import_staging s '
+                f'WHERE NOT EXISTS (SELECT 1 FROM {table} t WHERE {dedupe})'
+            )
+            inserted = cursor.rowcount
+        self.stats['imported'] += inserted
+        self.stats['duplicates'] += len(rows) - inserted
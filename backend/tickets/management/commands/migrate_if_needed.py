@@ -0,0 +1,40 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connections, DEFAULT_DB_ALIAS
+from django.db.migrations.executor import MigrationExecutor
+
+# Arbitrary key for pg_advisory_lock so concurrently starting containers migrate one at a time
+MIGRATION_LOCK_ID = 7_240_526
+
+
+class Command(BaseCommand):
+    help = "Run migrate only when there are unapplied migrations (cheap no-op on a warm restart)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+
+        if not self.pending_migrations(connection):
+            self.stdout.write('No migrations to apply.')
+            return
+
+        use_lock = connection.vendor == 'postgresql'
+        if use_lock:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_lock(%s)', [MIGRATION_LOCK_ID])
+        try:
+            # Another container may have migrated while we waited for the lock
+            if self.pending_migrations(connection):
+                call_command('migrate', database=options['database'], interactive=False, verbosity=options['verbosity'])
+            else:
+                self.stdout.write('Migrations were applied by another process.')
+        finally:
+            if use_lock:
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT pg_advisory_unlock(%s)', [MIGRATION_LOCK_ID])
+
+    def pending_migrations(self, connection):
+        executor = MigrationExecutor(connection)
+        return executor.migration_plan(executor.loader.graph.leaf_nodes())
@@ -0,0 +1,87 @@
+import json
+import re
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from django.core.management.base import BaseCommand
+
+VERIFY_PATH = re.compile(r'^/transaction/verify/(?P<reference>[^/]+)/?$')
+LIST_PATH = re.compile(r'^/transaction/?$')
+
+
+def load_transactions(path):
+    """Fixture: a JSON list of Paystack transaction objects, each with at least reference and status"""
+    if not path:
+        return {}
+    with open(path) as fixture:
+        return {tx['reference']: tx for tx in json.load(fixture)}
+
+
+class PaystackStubHandler(BaseHTTPRequestHandler):
+    transactions = {}
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        match = VERIFY_PATH.match(url.path)
+        if match:
+            transaction = self.transactions.get(match['reference'])
+            if transaction is None:
+                return self.send_json(400, {'status': False, 'message': 'Transaction reference not found'})
+            return self.send_json(200, {'status': True, 'message': 'Verification successful', 'data': transaction})
+        if LIST_PATH.match(url.path):
+            return self.send_json(200, self.list_transactions(parse_qs(url.query)))
+        self.send_json(404, {'status': False, 'message': 'Not found'})
+
+    def list_transactions(self, query):
+        """Paged like Paystack's GET /transaction; from/to compare against each transaction's created_at"""
+        def param(name, default=None):
+            return query.get(name, [default])[0]
+
+        page, per_page = int(param('page', 1)), int(param('perPage', 50))
+        matches = [
+            tx for tx in self.transactions.values()
+            if (not param('status') or tx.get('status') == param('status'))
+            and (not param('from') or tx.get('created_at', '') >= param('from'))
+            and (not param('to') or tx.get('created_at', '') <= param('to'))
+        ]
+        page_count = max(1, -(-len(matches) // per_page))
+        return {
+            'status': True,
+            'message': 'Transactions retrieved',
+            'data': matches[(page - 1) * per_page:page * per_page],
+            'meta': {'total': len(matches), 'perPage': per_page, 'page': page, 'pageCount': page_count},
+        }
+
+    def send_json(self, status_code, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve a local stand-in for the Paystack API from a fixture file. "
+        "Point PAYSTACK_BASE_URL at it (and set any PAYSTACK_SECRET_KEY) to run "
+        "payment jobs offline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--fixture', help='JSON list of transactions, e.g. [{"reference": "abc", "status": "success", "amount": 5000, "created_at": "2026-12-01T10:00:00Z"}]')
+
+    def handle(self, *args, **options):
+        PaystackStubHandler.transactions = load_transactions(options['fixture'])
+        server = ThreadingHTTPServer(('127.0.0.1', options['port']), PaystackStubHandler)
+        self.stdout.write(
+            f"Paystack stub with {len(PaystackStubHandler.transactions)} transactions on "
+            f"http://127.0.0.1:{options['port']}"
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,134 @@
+import json
+import time
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from tickets import paystack
+from tickets.caching import bump_tickets
+from tickets.jobs import bulk_delete_tickets
+from tickets.models import IdempotencyKey, Ticket
+
+
+class Command(BaseCommand):
+    help = (
+        "Reclaim unverified tickets left behind by checkouts that never completed. "
+        "Each pending reference older than the TTL is re-checked with Paystack first: "
+        "paid references are verified; ones Paystack reports as unknown, failed or abandoned "
+        "are deleted in small batches; anything else is kept for the next run. "
+        "Idempotency keys older than IDEMPOTENCY_KEY_TTL_HOURS are expired as well. "
+        "Intended to run from cron, e.g. hourly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ttl-hours', type=float, default=settings.PENDING_TICKET_TTL_HOURS,
+                            help='Only reap tickets created more than this many hours ago')
+        parser.add_argument('--batch-size', type=int, default=100, help='References per batch / transaction')
+        parser.add_argument('--pause', type=float, default=0.1, help='Seconds to sleep between batches')
+        parser.add_argument('--archive-file', help='Append reaped tickets as JSON lines to this file before deleting')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be reclaimed without changing anything')
+        parser.add_argument('--skip-paystack-check', action='store_true',
+                            help='Reap without asking Paystack (only if no payment can still be in flight)')
+        parser.add_argument('--idempotency-ttl-hours', type=float, default=settings.IDEMPOTENCY_KEY_TTL_HOURS,
+                            help='Delete stored idempotency keys created more than this many hours ago')
+
+    def handle(self, *args, **options):
+        check_paystack = not options['skip_paystack_check']
+        if check_paystack and not paystack.is_configured():
+            raise CommandError('PAYSTACK_SECRET_KEY is not set; configure it or pass --skip-paystack-check')
+
+        cutoff = timezone.now() - timedelta(hours=options['ttl_hours'])
+        pending = Ticket.objects.filter(verified=False, created_at__lt=cutoff)
+        report = {'references_checked': 0, 'tickets_reaped': 0, 'references_reaped': 0,
+                  'tickets_recovered': 0, 'references_recovered': 0, 'references_skipped': 0}
+        session = requests.Session()
+        started = time.monotonic()
+        last_reference = ''
+
+        while True:
+            # Keyset pagination over distinct references keeps each scan short
+            references = list(
+                pending.filter(paystack_reference__gt=last_reference)
+                .order_by('paystack_reference')
+                .values_list('paystack_reference', flat=True)
+                .distinct()[:options['batch_size']]
+            )
+            if not references:
+                break
+            last_reference = references[-1]
+            report['references_checked'] += len(references)
+
+            paid, unpaid = [], []
+            for reference in references:
+                if not check_paystack:
+                    unpaid.append(reference)
+                    continue
+                try:
+                    data = paystack.verify_transaction(reference, session=session)
+                except paystack.PaystackError as e:
+                    # Unknown state: keep the tickets and try again next run
+                    self.stderr.write(f"Skipping {reference}: {e}")
+                    report['references_skipped'] += 1
+                    continue
+                if paystack.transaction_succeeded(data):
+                    paid.append(reference)
+                elif paystack.transaction_unpaid(data):
+                    unpaid.append(reference)
+                else:
+                    # Still in flight, or an answer we do not understand: never delete on a guess
+                    tx_status = (data.get('data') or {}).get('status')
+                    self.stderr.write(f"Skipping {reference}: {f'transaction is {tx_status}' if tx_status else data.get('message')}")
+                    report['references_skipped'] += 1
+
+            if options['dry_run']:
+                report['tickets_recovered'] += pending.filter(paystack_reference__in=paid).count()
+                report['tickets_reaped'] += pending.filter(paystack_reference__in=unpaid).count()
+            else:
+                with transaction.atomic():
+                    if paid:
+                        # The buyer paid but never came back to verify
+                        ids = list(Ticket.objects.filter(paystack_reference__in=paid).values_list('id', flat=True))
+                        report['tickets_recovered'] += Ticket.objects.filter(id__in=ids).update(verified=True)
+                        transaction.on_commit(lambda: bump_tickets(ids))
+                    if unpaid:
+                        reaped = pending.filter(paystack_reference__in=unpaid)
+                        if options['archive_file']:
+                            self.archive(reaped, options['archive_file'])
+                        report['tickets_reaped'] += bulk_delete_tickets(reaped)
+            report['references_recovered'] += len(paid)
+            report['references_reaped'] += len(unpaid)
+
+            if options['pause']:
+                time.sleep(options['pause'])
+
+        report['idempotency_keys_expired'] = self.expire_idempotency_keys(
+            timezone.now() - timedelta(hours=options['idempotency_ttl_hours']), options
+        )
+        report['seconds'] = round(time.monotonic() - started, 2)
+        report['dry_run'] = options['dry_run']
+        self.stdout.write(json.dumps(report))
+
+    def expire_idempotency_keys(self, cutoff, options):
+        expired = IdempotencyKey.objects.filter(created_at__lt=cutoff)
+        if options['dry_run']:
+            return expired.count()
+        deleted = 0
+        while True:
+            ids = list(expired.values_list('id', flat=True)[:options['batch_size'] * 10])
+            if not ids:
+                return deleted
+            deleted += IdempotencyKey.objects.filter(id__in=ids).delete()[0]
+            if options['pause']:
+                time.sleep(options['pause'])
+
+    def archive(self, queryset, path):
+        rows = queryset.values(
+            'id', 'event_id', 'name', 'email', 'phone_number', 'paystack_reference', 'created_at', 'short_code'
+        )
+        with open(path, 'a') as archive:
+            for row in rows:
+                archive.write(json.dumps(row, default=str) + '\n')
@@ -0,0 +1,149 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+from decimal import Decimal
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from tickets import paystack
+from tickets.caching import bump_tickets
+from tickets.models import Ticket
+
+MISMATCH_PAID_WITHOUT_TICKETS = 'paid_without_tickets'
+MISMATCH_UNDERPAID = 'underpaid'
+MISMATCH_VERIFIED_NOT_PAID = 'verified_but_not_paid'
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconcile local tickets with Paystack's transaction list. Pages of GET /transaction are "
+        "fetched by a small worker pool; each page is matched against local references in one "
+        "query, paid references with pending tickets are verified in one UPDATE, and anything "
+        "that does not line up is reported. Point PAYSTACK_BASE_URL at `manage.py paystack_stub` "
+        "to run it offline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=float, default=7, help='Reconcile transactions from the last N days')
+        parser.add_argument('--per-page', type=int, default=100)
+        parser.add_argument('--workers', type=int, default=4, help='Concurrent page requests to Paystack')
+        parser.add_argument('--dry-run', action='store_true', help='Report without verifying any tickets')
+        parser.add_argument('--report-file', help='Write every mismatch to this file as JSON lines')
+
+    def handle(self, *args, **options):
+        if not paystack.is_configured():
+            raise CommandError('PAYSTACK_SECRET_KEY is not set')
+
+        self.dry_run = options['dry_run']
+        self.report = {'transactions_seen': 0, 'references_paid': 0, 'tickets_verified': 0,
+                       'already_verified': 0, 'pages': 0, 'failed_pages': [], 'mismatches': {}}
+        self.mismatches = []
+        started = time.monotonic()
+        end = timezone.now()
+        start = end - timedelta(days=options['days'])
+
+        sessions = threading.local()
+
+        def fetch(page):
+            if not hasattr(sessions, 'session'):
+                sessions.session = requests.Session()
+            return paystack.list_transactions(
+                page=page, per_page=options['per_page'], start=start, end=end, session=sessions.session
+            )
+
+        try:
+            first = fetch(1)
+        except paystack.PaystackError as e:
+            raise CommandError(f'Could not list Paystack transactions: {e}')
+        page_count = int((first.get('meta') or {}).get('pageCount') or 1)
+        self.process_page(first.get('data') or [])
+
+        # Workers only talk to Paystack; matching and updates stay on this thread's connection
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            futures = {pool.submit(fetch, page): page for page in range(2, page_count + 1)}
+            for future in as_completed(futures):
+                try:
+                    response = future.result()
+                except paystack.PaystackError as e:
+                    self.stderr.write(f"Page {futures[future]} failed: {e}")
+                    self.report['failed_pages'].append(futures[future])
+                    continue
+                self.process_page(response.get('data') or [])
+
+        if options['report_file']:
+            with open(options['report_file'], 'w') as report_file:
+                for mismatch in self.mismatches:
+                    report_file.write(json.dumps(mismatch, default=str) + '\n')
+
+        self.report['failed_pages'].sort()
+        self.report['seconds'] = round(time.monotonic() - started, 2)
+        self.report['dry_run'] = self.dry_run
+        self.stdout.write(json.dumps(self.report))
+
+    def process_page(self, transactions):
+        self.report['pages'] += 1
+        self.report['transactions_seen'] += len(transactions)
+        by_reference = {tx['reference']: tx for tx in transactions if tx.get('reference')}
+        if not by_reference:
+            return
+
+        local = {
+            row['paystack_reference']: row
+            for row in Ticket.objects.filter(paystack_reference__in=by_reference)
+            .values('paystack_reference', 'event__ticket_price')
+            .annotate(tickets=Count('id'), verified_tickets=Count('id', filter=Q(verified=True)))
+        }
+
+        to_verify = []
+        for reference, tx in by_reference.items():
+            tickets = local.get(reference)
+            paid = tx.get('status') == 'success'
+            if not paid:
+                if tickets and tickets['verified_tickets']:
+                    self.mismatch(MISMATCH_VERIFIED_NOT_PAID, tx, tickets)
+                continue
+
+            self.report['references_paid'] += 1
+            if not tickets:
+                self.mismatch(MISMATCH_PAID_WITHOUT_TICKETS, tx, None)
+                continue
+            price = tickets['event__ticket_price']
+            # Paystack amounts are in the minor unit (pesewas)
+            if price is not None and Decimal(tx.get('amount') or 0) < tickets['tickets'] * price * 100:
+                # Reported for follow-up; verified like VerifyPaymentView would, which only checks the status
+                self.mismatch(MISMATCH_UNDERPAID, tx, tickets)
+            if tickets['verified_tickets'] == tickets['tickets']:
+                self.report['already_verified'] += 1
+            else:
+                to_verify.append(reference)
+
+        if to_verify and not self.dry_run:
+            with transaction.atomic():
+                ids = list(Ticket.objects.filter(
+                    paystack_reference__in=to_verify, verified=False
+                ).values_list('id', flat=True))
+                self.report['tickets_verified'] += Ticket.objects.filter(id__in=ids, verified=False).update(verified=True)
+                transaction.on_commit(lambda: bump_tickets(ids))
+        elif to_verify:
+            self.report['tickets_verified'] += Ticket.objects.filter(
+                paystack_reference__in=to_verify, verified=False
+            ).count()
+
+    def mismatch(self, kind, tx, tickets):
+        counts = self.report['mismatches']
+        counts[kind] = counts.get(kind, 0) + 1
+        self.mismatches.append({
+            'type': kind,
+            'reference': tx.get('reference'),
+            'paystack_status': tx.get('status'),
+            'amount': tx.get('amount'),
+            'email': (tx.get('customer') or {}).get('email'),
+            'local_tickets': tickets['tickets'] if tickets else 0,
+            'local_verified': tickets['verified_tickets'] if tickets else 0,
+        })
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from tickets.jobs import resume_stale_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Run pending, failed or abandoned event deletion jobs to completion. "
+        "Safe to schedule: jobs still running elsewhere are left alone. With --interval it "
+        "keeps running and checks again every N seconds (the `deletions` compose service)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, help='Keep running, checking for jobs every N seconds')
+
+    def handle(self, *args, **options):
+        while True:
+            job_ids = resume_stale_jobs()
+            if not job_ids and not options['interval']:
+                self.stdout.write('No deletion jobs to resume.')
+            for job_id in job_ids:
+                self.stdout.write(f'Processed event deletion job {job_id}')
+            if not options['interval']:
+                return
+            # Do not hold a database connection between checks
+            connections.close_all()
+            time.sleep(options['interval'])
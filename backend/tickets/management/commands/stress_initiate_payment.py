@@ -0,0 +1,70 @@
+import json
+import threading
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from tickets.models import IdempotencyKey, Ticket
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire many identical initiate-payment submissions in parallel at a running server "
+        "and check that the tickets were written exactly once. Point --url at a server "
+        "that shares this database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000/api/initiate-payment/')
+        parser.add_argument('--requests', type=int, default=50, help='Identical submissions to send')
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--names', type=int, default=2, help='Attendees per submission')
+        parser.add_argument('--no-header', action='store_true', help='Omit Idempotency-Key and rely on the reference')
+
+    def handle(self, *args, **options):
+        reference = f'stress-{uuid.uuid4().hex[:12]}'
+        payload = {
+            'reference': reference,
+            'email': 'stress@example.com',
+            'phone_number': '0240000000',
+            'names': [f'Stress Attendee {i + 1}' for i in range(options['names'])],
+        }
+        headers = {} if options['no_header'] else {'Idempotency-Key': reference}
+        barrier = threading.Barrier(min(options['concurrency'], options['requests']))
+
+        def submit(_):
+            try:
+                barrier.wait(timeout=5)
+            except threading.BrokenBarrierError:
+                pass
+            try:
+                response = requests.post(options['url'], json=payload, headers=headers, timeout=30)
+            except requests.RequestException as e:
+                return 'error', str(e)
+            return response.status_code, response.headers.get('Idempotent-Replayed') == 'true'
+
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            results = list(pool.map(submit, range(options['requests'])))
+
+        errors = [detail for code, detail in results if code == 'error']
+        if len(errors) == len(results):
+            raise CommandError(f'No request reached {options["url"]}: {errors[0]}')
+
+        tickets = Ticket.objects.filter(paystack_reference=reference).count()
+        report = {
+            'reference': reference,
+            'statuses': dict(Counter(str(code) for code, _ in results)),
+            'replayed': sum(1 for code, replayed in results if replayed is True),
+            'tickets_created': tickets,
+            'tickets_expected': options['names'],
+            'ok': tickets == options['names'],
+        }
+        self.stdout.write(json.dumps(report))
+
+        Ticket.objects.filter(paystack_reference=reference).delete()
+        IdempotencyKey.objects.filter(key__in=[reference, f'reference:{reference}']).delete()
+        if not report['ok']:
+            raise CommandError(f"Expected {options['names']} tickets for {reference}, found {tickets}")
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0006_event_ticket_price'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(max_length=10)),
+                ('path', models.CharField(max_length=2048)),
+                ('query_string', models.TextField(blank=True)),
+                ('status_code', models.PositiveSmallIntegerField(null=True)),
+                ('trigger', models.CharField(max_length=20)),
+                ('profiler', models.CharField(max_length=20)),
+                ('duration_ms', models.FloatField()),
+                ('query_count', models.PositiveIntegerField(default=0)),
+                ('query_time_ms', models.FloatField(default=0)),
+                ('profile_output', models.TextField()),
+                ('sql_trace', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0007_requestprofile'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inquiry',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['-created_at'], name='inquiry_unread_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0008_inquiry_unread_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventDeletionJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_name', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('batch_size', models.PositiveIntegerField(default=1000)),
+                ('total_tickets', models.PositiveIntegerField(default=0)),
+                ('deleted_tickets', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('event', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='deletion_jobs', to='tickets.event')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0009_eventdeletionjob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ticket',
+            name='paystack_reference',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('verified', False)), fields=['created_at'], name='ticket_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0011_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventSummary',
+            fields=[
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='tickets.event')),
+                ('tickets_sold', models.PositiveIntegerField(default=0)),
+                ('verified', models.PositiveIntegerField(default=0)),
+                ('checked_in', models.PositiveIntegerField(default=0)),
+                ('archived_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Event summaries',
+            },
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='is_archived',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='ArchivedTicket',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255)),
+                ('email', models.EmailField(max_length=254)),
+                ('phone_number', models.CharField(max_length=20)),
+                ('paystack_reference', models.CharField(max_length=100)),
+                ('verified', models.BooleanField(default=False)),
+                ('checked_in', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField()),
+                ('short_code', models.CharField(max_length=8)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_tickets', to='tickets.event')),
+            ],
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:08
+
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+
+
+# Frozen copies of tickets.models.normalize_email / normalize_phone
+def normalize_email(email):
+    return (email or '').strip().lower()
+
+
+def normalize_phone(phone_number):
+    digits = ''.join(ch for ch in str(phone_number or '') if ch.isdigit())
+    if digits.startswith('233') and len(digits) == 12:
+        digits = '0' + digits[3:]
+    return digits
+
+
+POSTGRES_BACKFILL = r"""
+UPDATE tickets_ticket SET
+    email_normalized = lower(btrim(email)),
+    phone_normalized = CASE
+        WHEN regexp_replace(phone_number, '\D', '', 'g') ~ '^233\d{9}$'
+            THEN '0' || substr(regexp_replace(phone_number, '\D', '', 'g'), 4)
+        ELSE regexp_replace(phone_number, '\D', '', 'g')
+    END
+"""
+
+
+def backfill_lookup_columns(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        # The migration runs in one transaction anyway; one set-based UPDATE is fastest
+        schema_editor.execute(POSTGRES_BACKFILL)
+        return
+
+    Ticket = apps.get_model('tickets', 'Ticket')
+    last_id = None
+    while True:
+        batch = Ticket.objects.order_by('id').only('id', 'email', 'phone_number')
+        if last_id is not None:
+            batch = batch.filter(id__gt=last_id)
+        tickets = list(batch[:BATCH_SIZE])
+        if not tickets:
+            break
+        for ticket in tickets:
+            ticket.email_normalized = normalize_email(ticket.email)
+            ticket.phone_normalized = normalize_phone(ticket.phone_number)
+        Ticket.objects.bulk_update(tickets, ['email_normalized', 'phone_normalized'])
+        last_id = tickets[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0013_ticket_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='email_normalized',
+            field=models.CharField(blank=True, default='', editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='phone_normalized',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20),
+        ),
+        # Before the indexes, so they are built once over the filled columns
+        migrations.RunPython(backfill_lookup_columns, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['event', 'email_normalized'], name='ticket_event_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['event', 'phone_normalized'], name='ticket_event_phone_idx'),
+        ),
+    ]
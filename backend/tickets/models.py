@@ -1,4 +1,6 @@
 from django.db import models
+import random
+import string
 import uuid
 
 class Event(models.Model):
@@ -8,34 +10,88 @@ class Event(models.Model):
     location = models.CharField(max_length=255, default="Ho Jubilee Park, Ho")
     is_active = models.BooleanField(default=False)
     ticket_price = models.DecimalField(max_digits=10, decimal_places=2, default=50.00)
+    is_archived = models.BooleanField(default=False) # Tickets moved to ArchivedTicket by `manage.py archive_event`
     
     def __str__(self):
         return self.name
 
+SHORT_CODE_ALPHABET = string.ascii_uppercase + string.digits
+SHORT_CODE_LENGTH = 8
+
+def generate_short_code():
+    # Custom 8-char alphanumeric code (e.g. AB12CD34)
+    return ''.join(random.choices(SHORT_CODE_ALPHABET, k=SHORT_CODE_LENGTH))
+
+def normalize_email(email):
+    return (email or '').strip().lower()
+
+def normalize_phone(phone_number):
+    # Digits only, in Ghana's national format: +233 24 123 4567 -> 0241234567
+    digits = ''.join(ch for ch in str(phone_number or '') if ch.isdigit())
+    if digits.startswith('233') and len(digits) == 12:
+        digits = '0' + digits[3:]
+    return digits
+
+def allocate_short_codes(count):
+    """Return `count` unused short codes, checking collisions with one query per round"""
+    codes = set()
+    while len(codes) < count:
+        candidates = {generate_short_code() for _ in range(count - len(codes))} - codes
+        taken = set(Ticket.objects.filter(short_code__in=candidates).values_list('short_code', flat=True))
+        codes |= candidates - taken
+    return list(codes)
+
+class TicketManager(models.Manager):
+    def bulk_create(self, objs, *args, **kwargs):
+        # save() is skipped by bulk_create; fill the lookup columns here instead
+        objs = list(objs)
+        for ticket in objs:
+            ticket.normalize_lookups()
+        return super().bulk_create(objs, *args, **kwargs)
+
 class Ticket(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='tickets', null=True, blank=True)
     name = models.CharField(max_length=255)
     email = models.EmailField()
     phone_number = models.CharField(max_length=20)
-    paystack_reference = models.CharField(max_length=100)
+    paystack_reference = models.CharField(max_length=100, db_index=True)
     verified = models.BooleanField(default=False)
     checked_in = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     short_code = models.CharField(max_length=8, unique=True, blank=True)
+    # Normalized copies of email / phone_number for the public ticket lookup
+    email_normalized = models.CharField(max_length=254, blank=True, default='', editable=False)
+    phone_normalized = models.CharField(max_length=20, blank=True, default='', editable=False)
+
+    objects = TicketManager()
+
+    def normalize_lookups(self):
+        self.email_normalized = normalize_email(self.email)
+        self.phone_normalized = normalize_phone(self.phone_number)
 
     def save(self, *args, **kwargs):
+        self.normalize_lookups()
         if not self.short_code:
-            import random
-            import string
             while True:
-                # Generate custom 8-char alphanumeric code (e.g. AB12CD34)
-                code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
+                code = generate_short_code()
                 if not Ticket.objects.filter(short_code=code).exists():
                     self.short_code = code
                     break
         super(Ticket, self).save(*args, **kwargs)
 
+    class Meta:
+        indexes = [
+            # Only pending rows, for the abandoned-checkout reaper
+            models.Index(fields=['created_at'], condition=models.Q(verified=False), name='ticket_pending_idx'),
+            # Changelist ordering and date_hierarchy in the admin, overall and per event
+            models.Index(fields=['created_at'], name='ticket_created_idx'),
+            models.Index(fields=['event', '-created_at'], name='ticket_event_created_idx'),
+            # Public ticket lookup, one probe per identifier within the active event
+            models.Index(fields=['event', 'email_normalized'], name='ticket_event_email_idx'),
+            models.Index(fields=['event', 'phone_normalized'], name='ticket_event_phone_idx'),
+        ]
+
     def __str__(self):
         return f"{self.name} - {self.short_code}"
 
@@ -50,7 +106,105 @@ class Inquiry(models.Model):
     class Meta:
         ordering = ['-created_at']
         verbose_name_plural = 'Inquiries'
+        indexes = [
+            # Backs the unread count and unread-first triage; only unread rows are indexed
+            models.Index(fields=['-created_at'], condition=models.Q(is_read=False), name='inquiry_unread_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.email}"
 
+
+class RequestProfile(models.Model):
+    """Profiler output and SQL trace captured for a single request"""
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=2048)
+    query_string = models.TextField(blank=True)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    trigger = models.CharField(max_length=20) # 'token' or 'sample'
+    profiler = models.CharField(max_length=20)
+    duration_ms = models.FloatField()
+    query_count = models.PositiveIntegerField(default=0)
+    query_time_ms = models.FloatField(default=0)
+    profile_output = models.TextField()
+    sql_trace = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
+
+class ArchivedTicket(models.Model):
+    """Ticket of an archived event, kept out of the hot tickets table and its indexes"""
+    id = models.UUIDField(primary_key=True, editable=False)
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='archived_tickets')
+    name = models.CharField(max_length=255)
+    email = models.EmailField()
+    phone_number = models.CharField(max_length=20)
+    paystack_reference = models.CharField(max_length=100)
+    verified = models.BooleanField(default=False)
+    checked_in = models.BooleanField(default=False)
+    created_at = models.DateTimeField()
+    short_code = models.CharField(max_length=8)
+
+    def __str__(self):
+        return f"{self.name} - {self.short_code} (archived)"
+
+class EventSummary(models.Model):
+    """Ticket totals of an archived event, read by the analytics views"""
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, primary_key=True, related_name='summary')
+    tickets_sold = models.PositiveIntegerField(default=0)
+    verified = models.PositiveIntegerField(default=0)
+    checked_in = models.PositiveIntegerField(default=0)
+    archived_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'Event summaries'
+
+    def __str__(self):
+        return f"Summary of {self.event}"
+
+class EventDeletionJob(models.Model):
+    """Background deletion of an event and its tickets in bounded batches"""
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    ACTIVE_STATUSES = [STATUS_PENDING, STATUS_RUNNING]
+
+    event = models.ForeignKey(Event, on_delete=models.SET_NULL, related_name='deletion_jobs', null=True, blank=True)
+    event_name = models.CharField(max_length=255)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    batch_size = models.PositiveIntegerField(default=1000)
+    total_tickets = models.PositiveIntegerField(default=0)
+    deleted_tickets = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True) # Heartbeat while running
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Delete {self.event_name} ({self.status})"
+
+class IdempotencyKey(models.Model):
+    """Stored outcome of a request, replayed for retries carrying the same key"""
+    key = models.CharField(max_length=255, unique=True)
+    endpoint = models.CharField(max_length=100)
+    request_hash = models.CharField(max_length=64)
+    response_status = models.PositiveSmallIntegerField(null=True)
+    response_body = models.JSONField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True) # Retention cutoff (reap_pending_tickets)
+
+    def __str__(self):
+        return f"{self.endpoint}: {self.key}"
@@ -0,0 +1,90 @@
+"""
+Minimal Paystack API client.
+
+PAYSTACK_BASE_URL can point at a local stub (``manage.py paystack_stub``) so
+jobs that talk to Paystack can run without network access.
+"""
+import requests
+from django.conf import settings
+
+
+# Final states of a transaction that was never paid (or was paid back)
+UNPAID_STATUSES = ('failed', 'abandoned', 'reversed')
+
+
+class PaystackError(Exception):
+    """Paystack could not be reached or returned an unusable response"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        # HTTP status of a non-2xx response; None when Paystack could not be reached
+        self.status_code = status_code
+
+
+def is_configured():
+    return bool(settings.PAYSTACK_SECRET_KEY)
+
+
+def _is_not_found(status_code, payload):
+    return status_code in (400, 404) and 'not found' in str(payload.get('message') or '').lower()
+
+
+def _get(path, params=None, session=None, allow_not_found=False):
+    headers = {
+        'Authorization': f'Bearer {settings.PAYSTACK_SECRET_KEY}',
+        'Content-Type': 'application/json',
+    }
+    url = f"{settings.PAYSTACK_BASE_URL.rstrip('/')}/{path.lstrip('/')}"
+    try:
+        response = (session or requests).get(url, headers=headers, params=params, timeout=settings.PAYSTACK_TIMEOUT)
+    except requests.RequestException as e:
+        raise PaystackError(str(e)) from e
+    try:
+        payload = response.json()
+    except ValueError:
+        payload = None
+    if not response.ok:
+        # A rejected key (401/403) or rate limit (429) says nothing about the transaction
+        if allow_not_found and isinstance(payload, dict) and _is_not_found(response.status_code, payload):
+            return payload
+        message = payload.get('message') if isinstance(payload, dict) else None
+        raise PaystackError(f"Paystack returned HTTP {response.status_code}: {message or response.reason}",
+                            status_code=response.status_code)
+    if not isinstance(payload, dict):
+        raise PaystackError('Paystack returned invalid JSON', status_code=response.status_code)
+    return payload
+
+
+def verify_transaction(reference, session=None):
+    """Raw response of GET /transaction/verify/<reference>; an unknown reference is a normal answer"""
+    return _get(f'transaction/verify/{reference}', session=session, allow_not_found=True)
+
+
+def list_transactions(page=1, per_page=100, status=None, start=None, end=None, session=None):
+    """Raw response of GET /transaction: one page of transactions plus ``meta.pageCount``"""
+    params = {'page': page, 'perPage': per_page}
+    if status:
+        params['status'] = status
+    if start:
+        params['from'] = start.isoformat()
+    if end:
+        params['to'] = end.isoformat()
+    response = _get('transaction', params=params, session=session)
+    if not response.get('status'):
+        raise PaystackError(response.get('message') or 'Paystack could not list transactions')
+    return response
+
+
+def transaction_succeeded(data):
+    return bool(data.get('status')) and (data.get('data') or {}).get('status') == 'success'
+
+
+def transaction_not_found(data):
+    return not data.get('status') and 'not found' in str(data.get('message') or '').lower()
+
+
+def transaction_unpaid(data):
+    """Paystack says the reference was never paid: unknown to it, or in a final unpaid state"""
+    if transaction_not_found(data):
+        return True
+    return bool(data.get('status')) and (data.get('data') or {}).get('status') in UNPAID_STATUSES
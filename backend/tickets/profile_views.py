@@ -0,0 +1,67 @@
+import json
+
+from django.http import HttpResponse
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status, permissions
+from .models import RequestProfile
+from .profiling import create_profile_token, TOKEN_QUERY_PARAM
+
+class ProfileTokenView(APIView):
+    """Issue a signed token that turns on profiling for requests carrying it"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        if not request.user.is_staff:
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        return Response({
+            'token': create_profile_token(request.user),
+            'header': 'X-Profile-Token',
+            'query_param': TOKEN_QUERY_PARAM,
+        })
+
+class ProfileListView(APIView):
+    """List stored request profiles, newest first"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        if not request.user.is_superuser:
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+        profiles = RequestProfile.objects.all()
+        path = request.query_params.get('path')
+        if path:
+            profiles = profiles.filter(path__startswith=path)
+
+        profiles = profiles.values(
+            'id', 'method', 'path', 'query_string', 'status_code', 'trigger', 'profiler',
+            'duration_ms', 'query_count', 'query_time_ms', 'created_at',
+        )
+        return Response(list(profiles))
+
+class ProfileDownloadView(APIView):
+    """Download the profiler output and SQL trace of a stored profile"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, id):
+        if not request.user.is_superuser:
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            profile = RequestProfile.objects.get(id=id)
+        except RequestProfile.DoesNotExist:
+            return Response({'error': 'Profile not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        lines = [
+            f"{profile.method} {profile.path}?{profile.query_string}".rstrip('?'),
+            f"Status: {profile.status_code}  Trigger: {profile.trigger}  Captured: {profile.created_at.isoformat()}",
+            f"Duration: {profile.duration_ms:.1f} ms  SQL: {profile.query_count} queries in {profile.query_time_ms:.1f} ms",
+            '',
+            f"== Profile ({profile.profiler}) ==",
+            profile.profile_output,
+            '== SQL trace ==',
+            json.dumps(profile.sql_trace, indent=2),
+        ]
+        response = HttpResponse('\n'.join(lines), content_type='text/plain; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="profile-{profile.id}.txt"'
+        return response
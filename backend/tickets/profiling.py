@@ -0,0 +1,175 @@
+"""
+On-demand request profiling.
+
+A request is profiled when it carries a signed profiling token (issued to staff
+by ``ProfileTokenView``) in the ``X-Profile-Token`` header or the ``_profile``
+query parameter, or when it is picked by 1-in-N sampling
+(``PROFILING_SAMPLE_RATE``). The profiler output and the full SQL trace are
+stored as ``RequestProfile`` rows, capped at ``PROFILING_MAX_STORED``.
+"""
+import cProfile
+import io
+import pstats
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+
+from .models import RequestProfile
+
+try:
+    from pyinstrument import Profiler as PyinstrumentProfiler
+except ImportError:  # pyinstrument is optional
+    PyinstrumentProfiler = None
+
+TOKEN_HEADER = 'HTTP_X_PROFILE_TOKEN'
+TOKEN_QUERY_PARAM = '_profile'
+TOKEN_SALT = 'tickets.profiling'
+MAX_PARAMS_LENGTH = 500
+
+
+def create_profile_token(user):
+    """Sign a profiling token for a staff user"""
+    return signing.dumps({'user': user.pk}, salt=TOKEN_SALT)
+
+
+def get_profile_trigger(request):
+    token = request.META.get(TOKEN_HEADER) or request.GET.get(TOKEN_QUERY_PARAM)
+    if token:
+        try:
+            signing.loads(token, salt=TOKEN_SALT, max_age=settings.PROFILING_TOKEN_MAX_AGE)
+            return 'token'
+        except signing.BadSignature:
+            pass
+
+    sample_rate = settings.PROFILING_SAMPLE_RATE
+    if sample_rate and random.randrange(sample_rate) == 0:
+        return 'sample'
+    return None
+
+
+class SQLTracer:
+    """Database execute wrapper recording every query with its timing"""
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'alias': self.alias,
+                'sql': sql,
+                'params': repr(params)[:MAX_PARAMS_LENGTH],
+                'many': many,
+                'duration_ms': round((time.perf_counter() - start) * 1000, 3),
+            })
+
+
+class CProfileBackend:
+    name = 'cprofile'
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+
+    def start(self):
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+
+    def output(self):
+        stream = io.StringIO()
+        stats = pstats.Stats(self.profiler, stream=stream)
+        stats.sort_stats('cumulative').print_stats(settings.PROFILING_STATS_LIMIT)
+        return stream.getvalue()
+
+
+class PyinstrumentBackend:
+    name = 'pyinstrument'
+
+    def __init__(self):
+        self.profiler = PyinstrumentProfiler()
+
+    def start(self):
+        self.profiler.start()
+
+    def stop(self):
+        self.profiler.stop()
+
+    def output(self):
+        return self.profiler.output_text(unicode=True)
+
+
+def get_profiler_backend():
+    if settings.PROFILING_BACKEND == 'pyinstrument' and PyinstrumentProfiler is not None:
+        return PyinstrumentBackend()
+    return CProfileBackend()
+
+
+def store_profile(request, response, trigger, backend, tracers, duration_ms):
+    queries = [query for tracer in tracers for query in tracer.queries]
+    profile = RequestProfile.objects.create(
+        method=request.method,
+        path=request.path[:2048],
+        query_string=request.META.get('QUERY_STRING', ''),
+        status_code=getattr(response, 'status_code', None),
+        trigger=trigger,
+        profiler=backend.name,
+        duration_ms=duration_ms,
+        query_count=len(queries),
+        query_time_ms=round(sum(q['duration_ms'] for q in queries), 3),
+        profile_output=backend.output(),
+        sql_trace=queries,
+    )
+
+    # Enforce retention cap, newest profiles win
+    stale_ids = list(
+        RequestProfile.objects.order_by('-created_at', '-id')
+        .values_list('id', flat=True)[settings.PROFILING_MAX_STORED:]
+    )
+    if stale_ids:
+        RequestProfile.objects.filter(id__in=stale_ids).delete()
+    return profile
+
+
+class RequestProfilingMiddleware:
+    """Profile opted-in or sampled requests and store the result"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.PROFILING_ENABLED:
+            return self.get_response(request)
+
+        trigger = get_profile_trigger(request)
+        if trigger is None:
+            return self.get_response(request)
+
+        backend = get_profiler_backend()
+        tracers = [SQLTracer(conn.alias) for conn in connections.all()]
+        with ExitStack() as stack:
+            for tracer in tracers:
+                stack.enter_context(connections[tracer.alias].execute_wrapper(tracer))
+            start = time.perf_counter()
+            backend.start()
+            try:
+                response = self.get_response(request)
+            finally:
+                backend.stop()
+            duration_ms = round((time.perf_counter() - start) * 1000, 3)
+
+        try:
+            profile = store_profile(request, response, trigger, backend, tracers, duration_ms)
+            response['X-Profile-Id'] = str(profile.id)
+        except Exception as e:
+            # Profiling must never break the request being profiled
+            print(f"Request profile could not be stored: {e}")
+        return response
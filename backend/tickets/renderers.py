@@ -0,0 +1,33 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the stdlib encoder
+    orjson = None
+
+_encoder = JSONEncoder()
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer backed by orjson for compact output. Produces the same
+    bytes as DRF's JSONRenderer; pretty-printed responses
+    ('application/json; indent=4', browsable API) and environments without
+    orjson go through the stdlib encoder.
+    """
+    options = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Types orjson does not know natively (Decimal, lazy strings, ...) use DRF's encoder
+        ret = orjson.dumps(data, default=_encoder.default, option=self.options)
+
+        # Match JSONRenderer: escape U+2028/U+2029 so output stays a JavaScript subset
+        if b'\xe2\x80' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
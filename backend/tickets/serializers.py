@@ -7,9 +7,35 @@ class TicketSerializer(serializers.ModelSerializer):
         fields = ['id', 'event', 'name', 'email', 'phone_number', 'paystack_reference', 'verified', 'checked_in', 'created_at', 'short_code']
         read_only_fields = ['id', 'verified', 'checked_in', 'created_at', 'short_code']
 
-from .models import Event
+from .models import Event, EventDeletionJob
 
 class EventSerializer(serializers.ModelSerializer):
     class Meta:
         model = Event
         fields = '__all__'
+
+class EventDeletionJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = EventDeletionJob
+        fields = ['id', 'event', 'event_name', 'status', 'batch_size', 'total_tickets', 'deleted_tickets', 'error', 'created_at', 'updated_at', 'finished_at']
+
+
+# Fast path for list and bulk responses: build the same dicts a plain
+# ModelSerializer would, straight from values_list() rows, skipping model
+# instances and per-field serializer calls. Only valid for serializers without
+# custom fields or to_representation(); datetimes and UUIDs are left for the
+# renderer, which formats them exactly like the serializer fields do.
+
+def values_fields(serializer_class):
+    """Output field names and matching database columns of a ModelSerializer"""
+    meta = serializer_class.Meta
+    columns = [meta.model._meta.get_field(name).attname for name in meta.fields]
+    return list(meta.fields), columns
+
+def values_queryset(queryset, serializer_class):
+    _, columns = values_fields(serializer_class)
+    return queryset.values_list(*columns)
+
+def values_rows(rows, serializer_class):
+    fields, _ = values_fields(serializer_class)
+    return [dict(zip(fields, row)) for row in rows]
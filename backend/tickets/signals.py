@@ -0,0 +1,40 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import Event, Ticket
+from .caching import bump_version, bump_tickets, EVENTS
+from .authentication import (
+    USER_CLAIMS, expire_user_claims, invalidate_cached_user, revoke_user_tokens, restore_user_tokens,
+)
+
+@receiver([post_save, post_delete], sender=Event)
+def invalidate_event_cache(sender, **kwargs):
+    bump_version(EVENTS)
+
+@receiver([post_save, post_delete], sender=Ticket)
+def invalidate_ticket_cache(sender, instance, **kwargs):
+    bump_tickets([instance.pk])
+
+@receiver(pre_save, sender=User)
+def remember_user_claims(sender, instance, update_fields=None, **kwargs):
+    # Saves that cannot touch the claims (e.g. last_login on login) skip the query
+    if instance.pk is None or (update_fields is not None and not set(update_fields) & set(USER_CLAIMS)):
+        instance._previous_claims = None
+        return
+    instance._previous_claims = User.objects.filter(pk=instance.pk).values_list(*USER_CLAIMS).first()
+
+@receiver(post_save, sender=User)
+def refresh_user_auth(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+    if instance.is_active:
+        restore_user_tokens(instance.pk)
+    else:
+        revoke_user_tokens(instance.pk)
+    previous = getattr(instance, '_previous_claims', None)
+    if previous is not None and previous != tuple(getattr(instance, claim) for claim in USER_CLAIMS):
+        # Outstanding access tokens still carry the old flags
+        expire_user_claims(instance.pk)
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user(sender, instance, **kwargs):
+    revoke_user_tokens(instance.pk)
@@ -1,3 +1,289 @@
-from django.test import TestCase
+import threading
+import tempfile
+from io import StringIO
+import uuid
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import caching
+from .caching import ticket_namespace
+from .idempotency import REPLAY_HEADER
+from .models import Event, EventDeletionJob, IdempotencyKey, Inquiry, Ticket, allocate_short_codes
+from .views import InitiatePaymentView
+
+
+@override_settings(LOAD_SHED_ENABLED=False)
+@mock.patch.object(InitiatePaymentView, 'throttle_classes', [])
+class InitiatePaymentIdempotencyTests(TransactionTestCase):
+    """Concurrent double-submits of one checkout must create its tickets exactly once"""
+    threads = 8
+
+    def setUp(self):
+        Event.objects.create(name='Waakye Fest 2026', is_active=True)
+        self.payload = {
+            'reference': 'ref-concurrent',
+            'email': 'buyer@example.com',
+            'phone_number': '0240000000',
+            'names': ['Ama', 'Kofi', 'Esi'],
+        }
+
+    def submit(self, payload, key):
+        return APIClient().post('/api/initiate-payment/', payload, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def submit_in_parallel(self, key):
+        barrier = threading.Barrier(self.threads)
+        responses, errors = [], []
+
+        def worker():
+            try:
+                barrier.wait(timeout=5)
+                responses.append(self.submit(self.payload, key))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker) for _ in range(self.threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        self.assertEqual(errors, [])
+        return responses
+
+    def test_parallel_submissions_create_tickets_once(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            # Shared-cache SQLite fails lock waits immediately instead of blocking like Postgres
+            # (or a file-backed SQLite test database) does
+            self.skipTest('needs a database that waits on locks')
+        responses = self.submit_in_parallel('checkout-1')
+
+        self.assertEqual(len(responses), self.threads)
+        self.assertEqual(Ticket.objects.filter(paystack_reference='ref-concurrent').count(), 3)
+        self.assertEqual(IdempotencyKey.objects.filter(key='checkout-1').count(), 1)
+        originals = [r for r in responses if r.status_code == 201 and not r.has_header(REPLAY_HEADER)]
+        self.assertEqual(len(originals), 1)
+        for response in responses:
+            # Losers either replay the stored outcome or saw the first request still in flight
+            self.assertIn(response.status_code, (201, 409))
+            if response.status_code == 201:
+                self.assertEqual(response.json(), {'message': 'Transaction initialized', 'count': 3})
+
+    def test_retry_replays_stored_response(self):
+        first = self.submit(self.payload, 'checkout-2')
+        retry = self.submit(self.payload, 'checkout-2')
+
+        self.assertEqual(first.status_code, 201)
+        self.assertFalse(first.has_header(REPLAY_HEADER))
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry[REPLAY_HEADER], 'true')
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(Ticket.objects.count(), 3)
+
+    def test_key_reused_for_different_payload_is_rejected(self):
+        self.submit(self.payload, 'checkout-3')
+        response = self.submit({**self.payload, 'names': ['Someone Else']}, 'checkout-3')
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Ticket.objects.count(), 3)
+
+
+class IdempotencyKeyRetentionTests(TransactionTestCase):
+    def test_reaper_expires_old_keys(self):
+        old = IdempotencyKey.objects.create(key='old', endpoint='initiate-payment', request_hash='x')
+        IdempotencyKey.objects.filter(id=old.id).update(created_at=timezone.now() - timedelta(hours=100))
+        IdempotencyKey.objects.create(key='recent', endpoint='initiate-payment', request_hash='x')
+
+        call_command('reap_pending_tickets', '--skip-paystack-check', '--pause', '0', '--idempotency-ttl-hours', '72',
+                     stdout=StringIO())
+
+        self.assertEqual(list(IdempotencyKey.objects.values_list('key', flat=True)), ['recent'])
+
+
+@override_settings(LOAD_SHED_ENABLED=False)
+class IPThrottleTests(TestCase):
+    """The per-IP buckets must not be dodged with a forged X-Forwarded-For"""
+    inquiry = {'name': 'Ama', 'email': 'ama@example.com', 'phone': '0240000000', 'message': 'Hello'}
+
+    def setUp(self):
+        cache.clear()
+
+    def post_inquiries(self, forwarded_for):
+        return [
+            self.client.post('/api/inquiries/', self.inquiry, content_type='application/json',
+                             REMOTE_ADDR='203.0.113.7', HTTP_X_FORWARDED_FOR=forwarded_for(i)).status_code
+            for i in range(7)
+        ]
+
+    def test_spoofed_forwarded_for_is_ignored_without_proxies(self):
+        statuses = self.post_inquiries(lambda i: f'198.51.100.{i}')
+        self.assertEqual(statuses, [201] * 5 + [429] * 2)
+
+    def test_only_the_proxy_supplied_hop_is_trusted(self):
+        rest_framework = {**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}
+        with override_settings(REST_FRAMEWORK=rest_framework):
+            # The proxy appends the real client address after whatever the client sent
+            statuses = self.post_inquiries(lambda i: f'198.51.100.{i}, 192.0.2.10')
+        self.assertEqual(statuses, [201] * 5 + [429] * 2)
+
+
+@override_settings(LOAD_SHED_ENABLED=False, RESPONSE_CACHE_ENABLED=True)
+class TicketDetailCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        event = Event.objects.create(name='Waakye Fest 2026', is_active=True)
+        self.ticket = Ticket.objects.create(event=event, name='Ama', email='ama@example.com', paystack_reference='ref-1')
+
+    def test_unknown_ticket_leaves_no_version_behind(self):
+        ticket_id = uuid.uuid4()
+        self.assertEqual(self.client.get(f'/api/ticket/{ticket_id}/').status_code, 404)
+        self.assertIsNone(cache.get(f'cache-version:{ticket_namespace(ticket_id)}'))
+
+    def test_ticket_page_is_private_and_revalidated_after_a_write(self):
+        first = self.client.get(f'/api/ticket/{self.ticket.id}/')
+        self.assertIn('private', first['Cache-Control'])
+        self.assertEqual(self.client.get(f'/api/ticket/{self.ticket.id}/', HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+        self.ticket.checked_in = True
+        self.ticket.save()
+        second = self.client.get(f'/api/ticket/{self.ticket.id}/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertTrue(second.json()['checked_in'])
+
+
+@override_settings(LOAD_SHED_ENABLED=False, RESPONSE_CACHE_ENABLED=True)
+class TicketAdminActionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        event = Event.objects.create(name='Waakye Fest 2026', is_active=True)
+        Ticket.objects.bulk_create([
+            Ticket(event=event, name=f'Guest {i}', email='guest@example.com', paystack_reference=f'ref-{i}',
+                   verified=True, short_code=code)
+            for i, code in enumerate(allocate_short_codes(5))
+        ])
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+
+    @mock.patch.object(caching, 'BUMP_TICKETS_LIMIT', 2)
+    def test_select_all_updates_in_one_statement_and_invalidates_pages(self):
+        ticket = Ticket.objects.first()
+        page = self.client.get(f'/api/ticket/{ticket.id}/')
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post('/admin/tickets/ticket/', {
+                'action': 'mark_checked_in', 'select_across': '1', 'index': '0', '_selected_action': [str(ticket.id)],
+            })
+        updates = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE "tickets_ticket"')]
+        self.assertEqual(len(updates), 1)
+        self.assertNotIn(' IN (', updates[0])
+        self.assertEqual(Ticket.objects.filter(checked_in=True).count(), 5)
+
+        # More tickets than the per-ticket limit: every page is invalidated at once
+        again = self.client.get(f'/api/ticket/{ticket.id}/', HTTP_IF_NONE_MATCH=page['ETag'])
+        self.assertEqual(again.status_code, 200)
+        self.assertTrue(again.json()['checked_in'])
+
+
+@override_settings(LOAD_SHED_ENABLED=False)
+class TicketLookupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        event = Event.objects.create(name='Waakye Fest 2026', is_active=True)
+        self.ticket = Ticket.objects.create(event=event, name='Ama', email='Ama@Example.com', phone_number='+233 24 000 0000',
+                                            paystack_reference='ref-1', verified=True)
+
+    def lookup(self, **data):
+        return self.client.post('/api/tickets/lookup/', data, content_type='application/json')
+
+    @mock.patch('tickets.lookup_views.resend_tickets')
+    def test_codes_only_go_to_the_email_on_file(self, resend):
+        response = self.lookup(email='ama@example.com', phone_number='0240000000')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([ticket['name'] for ticket in response.json()['tickets']], ['Ama'])
+        self.assertNotIn(str(self.ticket.id), response.content.decode())
+        self.assertNotIn(self.ticket.short_code, response.content.decode())
+        (event_name, rows), _ = resend.call_args
+        self.assertEqual([row['short_code'] for row in rows], [self.ticket.short_code])
+
+    @mock.patch('tickets.lookup_views.resend_tickets')
+    def test_phone_guesses_are_limited_across_email_addresses(self, resend):
+        statuses = [self.lookup(email=f'guess{i}@example.com', phone_number='0240000000').status_code for i in range(6)]
+        self.assertEqual(statuses, [404] * 5 + [429])
+
+
+class UnreadInquiryCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Inquiry.objects.create(name='Ama', email='ama@example.com', phone='0240000000', message='Hello')
+
+    @override_settings(SHARED_CACHE=False)
+    def test_counts_from_the_database_without_a_shared_cache(self):
+        # What another worker's stale per-process cache could hold
+        cache.set(caching.UNREAD_INQUIRIES_KEY, 99)
+        self.assertEqual(caching.get_unread_inquiry_count(), 1)
+
+    @override_settings(SHARED_CACHE=True)
+    def test_cached_until_invalidated_with_a_shared_cache(self):
+        self.assertEqual(caching.get_unread_inquiry_count(), 1)
+        Inquiry.objects.update(is_read=True)
+        self.assertEqual(caching.get_unread_inquiry_count(), 1)
+        caching.invalidate_unread_inquiry_count()
+        self.assertEqual(caching.get_unread_inquiry_count(), 0)
+
+
+@override_settings(LOAD_SHED_ENABLED=False)
+class EventDeletionStreamTests(TestCase):
+    def setUp(self):
+        self.job = EventDeletionJob.objects.create(event_name='Old', status=EventDeletionJob.STATUS_COMPLETED)
+        self.other = EventDeletionJob.objects.create(event_name='Older', status=EventDeletionJob.STATUS_COMPLETED)
+        self.api = APIClient()
+        self.api.force_authenticate(User.objects.create_user('organizer', password='pw'))
+
+    def stream(self, job, token):
+        return self.client.get(f'/api/events/deletion-jobs/{job.id}/', {'stream': '1', 'token': token})
+
+    def test_eventsource_can_stream_with_the_job_token(self):
+        token = self.api.get(f'/api/events/deletion-jobs/{self.job.id}/').json()['stream_token']
+
+        response = self.stream(self.job, token)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('event: progress', b''.join(response.streaming_content).decode())
+
+    def test_token_is_bound_to_its_job_and_required(self):
+        token = self.api.get(f'/api/events/deletion-jobs/{self.job.id}/').json()['stream_token']
+
+        self.assertEqual(self.stream(self.other, token).status_code, 401)
+        self.assertEqual(self.stream(self.job, 'forged').status_code, 401)
+        self.assertEqual(self.client.get(f'/api/events/deletion-jobs/{self.job.id}/', {'token': token}).status_code, 401)
+
+
+class ImportTicketsTests(TestCase):
+    def test_bad_and_unknown_event_ids_are_counted_as_invalid(self):
+        event = Event.objects.create(name='Waakye Fest 2026', is_active=True)
+        rows = (
+            'name,email,event_id\n'
+            f'Ama,ama@example.com,{event.id}\n'
+            'Kofi,kofi@example.com,abc\n'
+            f'Esi,esi@example.com,{event.id + 100}\n'
+            'Yaw,yaw@example.com,\n'
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            path = f'{directory}/tickets.csv'
+            with open(path, 'w') as handle:
+                handle.write(rows)
+            out = StringIO()
+            call_command('import_tickets', path, stdout=out)
+
+        self.assertEqual(set(Ticket.objects.values_list('name', flat=True)), {'Ama', 'Yaw'})
+        self.assertTrue(Ticket.objects.filter(name='Yaw', event=event).exists())
+        self.assertIn('"invalid": 2', out.getvalue())
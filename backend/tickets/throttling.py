@@ -0,0 +1,257 @@
+"""
+Rate limiting and load shedding for the public endpoints.
+
+Throttles are token buckets: a rate of ``'20/min'`` allows bursts of 20 and
+refills 20 tokens per minute. Bucket state lives in the default cache; with
+REDIS_URL set each check is one atomic Lua script, so limits hold across all
+gunicorn workers. Views opt in like DRF's ``ScopedRateThrottle``: set
+``throttle_scope`` and the throttle classes, and configure the rates in
+``REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']``. ``ReferenceThrottle`` uses the
+``<scope>_reference`` rate, keyed by the Paystack reference in the request;
+``LookupIdentifierThrottle`` the ``<scope>_identifier`` rate, keyed by the
+normalized email or phone number.
+
+``LoadSheddingMiddleware`` keeps a per-worker moving average of request
+latency. Once it passes ``LOAD_SHED_TARGET_MS`` low-priority requests are
+answered with 503 straight away, and past twice the target normal ones are
+too; payment verification, check-in and the other ``LOAD_SHED_CRITICAL_PATHS``
+are never shed.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import normalize_email, normalize_phone
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# KEYS[1] bucket; ARGV capacity, tokens per second. Returns {allowed, seconds to wait}
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(wait)}
+"""
+
+_local_lock = threading.Lock()
+_bucket_script = None
+# This worker's LoadSheddingMiddleware, read by the readiness probe
+_load_monitor = None
+
+
+def parse_rate(rate):
+    """'20/min' -> (capacity 20, refill 20/60 tokens per second)"""
+    count, period = rate.split('/')
+    capacity = int(count)
+    return capacity, capacity / DURATIONS[period[0]]
+
+
+def _redis_client(key):
+    # Only Django's RedisCache exposes a raw client
+    backend = getattr(cache, '_cache', None)
+    if backend is None or not hasattr(backend, 'get_client'):
+        return None
+    return backend.get_client(key, write=True)
+
+
+def take_token(key, capacity, refill_rate):
+    """Take one token from the bucket at ``key``; returns (allowed, seconds until a token is available)"""
+    global _bucket_script
+    cache_key = cache.make_key(key)
+    client = _redis_client(cache_key)
+    if client is not None:
+        if _bucket_script is None:
+            _bucket_script = client.register_script(TOKEN_BUCKET_LUA)
+        allowed, wait = _bucket_script(keys=[cache_key], args=[capacity, refill_rate], client=client)
+        return bool(allowed), float(wait)
+
+    # Per-process cache (development): a lock is enough to make this atomic
+    with _local_lock:
+        now = time.time()
+        tokens, stamp = cache.get(key) or (capacity, now)
+        tokens = min(capacity, tokens + max(0.0, now - stamp) * refill_rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        cache.set(key, (tokens, now), int(capacity / refill_rate) + 1)
+    return allowed, 0.0 if allowed else (1 - tokens) / refill_rate
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Token bucket throttle for the view's ``throttle_scope``; subclasses pick the identity"""
+    scope_suffix = ''
+
+    def get_rate(self, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if not scope:
+            return None
+        return api_settings.DEFAULT_THROTTLE_RATES.get(scope + self.scope_suffix)
+
+    def get_identity(self, request, view):
+        raise NotImplementedError
+
+    def get_identities(self, request, view):
+        """Every bucket the request draws from; it is refused if any of them is empty"""
+        identity = self.get_identity(request, view)
+        return [identity] if identity else []
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        rate = self.get_rate(view)
+        if not rate:
+            return True
+        capacity, refill_rate = parse_rate(rate)
+        for identity in self.get_identities(request, view):
+            key = f'throttle:{view.throttle_scope}{self.scope_suffix}:{identity}'
+            allowed, wait = take_token(key, capacity, refill_rate)
+            if not allowed:
+                self.wait_seconds = wait
+                return False
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class IPThrottle(TokenBucketThrottle):
+    """Per client address; X-Forwarded-For is only trusted as far as REST_FRAMEWORK['NUM_PROXIES']"""
+
+    def get_identity(self, request, view):
+        return self.get_ident(request)
+
+
+class ReferenceThrottle(TokenBucketThrottle):
+    """Limits retries against a single Paystack reference, whatever IP they come from"""
+    scope_suffix = '_reference'
+
+    def get_identity(self, request, view):
+        reference = request.data.get('reference') if hasattr(request.data, 'get') else None
+        return str(reference)[:100] if reference else None
+
+
+class LookupIdentifierThrottle(TokenBucketThrottle):
+    """
+    Limits lookups of one email address and of one phone number, whatever IP
+    they come from. Both are charged when both are sent, so guessing phone
+    numbers across many email addresses still runs into each number's limit.
+    """
+    scope_suffix = '_identifier'
+
+    def get_identities(self, request, view):
+        if not hasattr(request.data, 'get'):
+            return []
+        email = normalize_email(request.data.get('email'))
+        phone = normalize_phone(request.data.get('phone_number'))
+        return [identity for identity in (email and f'email:{email}', phone and f'phone:{phone}') if identity]
+
+
+PRIORITY_CRITICAL = 'critical'
+PRIORITY_NORMAL = 'normal'
+PRIORITY_LOW = 'low'
+
+
+def has_valid_access_token(request):
+    """A correctly signed, unexpired access token; checked without touching the database"""
+    parts = request.META.get('HTTP_AUTHORIZATION', '').split()
+    if len(parts) != 2 or parts[0] not in jwt_settings.AUTH_HEADER_TYPES:
+        return False
+    try:
+        AccessToken(parts[1])
+    except TokenError:
+        return False
+    return True
+
+
+def request_priority(request):
+    path = request.path_info
+    if any(path.startswith(prefix) for prefix in settings.LOAD_SHED_CRITICAL_PATHS):
+        return PRIORITY_CRITICAL
+    # Buyers starting a checkout, and organizers' dashboards. Only a token that verifies
+    # counts: any Authorization header would let bots skip the first shedding tier
+    if request.method not in ('GET', 'HEAD', 'OPTIONS') or has_valid_access_token(request):
+        return PRIORITY_NORMAL
+    return PRIORITY_LOW
+
+
+def recent_request_latency_ms():
+    """This worker's moving average request latency, or None when load shedding is off"""
+    if _load_monitor is None or not settings.LOAD_SHED_ENABLED:
+        return None
+    return _load_monitor.current_latency(time.monotonic())
+
+
+class LoadSheddingMiddleware:
+    """Reject lower-priority requests early while this worker's latency is above target"""
+
+    # Seconds for an idle average to halve, so shedding stops once traffic calms down
+    HALF_LIFE = 5.0
+    # Weight of each new sample in the moving average
+    ALPHA = 0.2
+
+    def __init__(self, get_response):
+        global _load_monitor
+        self.get_response = get_response
+        self.lock = threading.Lock()
+        self.average_ms = 0.0
+        self.updated = time.monotonic()
+        _load_monitor = self
+
+    def current_latency(self, now):
+        return self.average_ms * 0.5 ** ((now - self.updated) / self.HALF_LIFE)
+
+    def record(self, elapsed_ms, now):
+        with self.lock:
+            self.average_ms = self.current_latency(now) * (1 - self.ALPHA) + elapsed_ms * self.ALPHA
+            self.updated = now
+
+    def should_shed(self, request, now):
+        target = settings.LOAD_SHED_TARGET_MS
+        latency = self.current_latency(now)
+        if latency <= target:
+            return False
+        # Only classified under load, so the token check stays off the normal path
+        priority = request_priority(request)
+        if priority == PRIORITY_CRITICAL:
+            return False
+        if priority == PRIORITY_LOW:
+            return latency > target
+        return latency > 2 * target
+
+    def __call__(self, request):
+        if not settings.LOAD_SHED_ENABLED:
+            return self.get_response(request)
+
+        started = time.monotonic()
+        if self.should_shed(request, started):
+            response = JsonResponse({'error': 'Server is busy, please retry shortly'}, status=503)
+            response['Retry-After'] = str(settings.LOAD_SHED_RETRY_AFTER)
+            return response
+
+        response = self.get_response(request)
+        finished = time.monotonic()
+        # Streams report their setup time only, which is what matters for capacity
+        self.record((finished - started) * 1000, finished)
+        return response
@@ -1,32 +1,37 @@
 from django.urls import path
-from .views import VerifyPaymentView, TicketDetailView, DashboardStatsView, TransactionListView, InitiatePaymentView, EventSettingsView, CheckInView
-from .analytics_views import EventAnalyticsView, YearOverYearAnalyticsView
-from .user_views import OrganizerListView, OrganizerCreateView, OrganizerDeleteView, CurrentUserView
-from .inquiry_views import InquiryCreateView, InquiryListView, InquiryUnreadCountView, InquiryMarkReadView, InquiryMarkUnreadView
-from .event_views import EventListCreateView, EventDetailView, EventSetActiveView
-from .health_views import health_check
+from wakyefest_backend.startup import lazy_view
+from .health_views import health_check, liveness, readiness
 
+# Views are imported on first request (or by the gunicorn warm-up hook), not at URLconf import
 urlpatterns = [
     path('health/', health_check, name='health-check'),
-    path('initiate-payment/', InitiatePaymentView.as_view(), name='initiate-payment'),
-    path('verify-payment/', VerifyPaymentView.as_view(), name='verify-payment'),
-    path('ticket/<uuid:id>/', TicketDetailView.as_view(), name='ticket-detail'),
-    path('stats/', DashboardStatsView.as_view(), name='stats'),
-    path('transactions/', TransactionListView.as_view(), name='transactions-list'),
-    path('settings/', EventSettingsView.as_view(), name='event-settings'),
-    path('check-in/', CheckInView.as_view(), name='check-in'),
-    path('analytics/events/', EventAnalyticsView.as_view(), name='analytics-events'),
-    path('analytics/yoy/', YearOverYearAnalyticsView.as_view(), name='analytics-yoy'),
-    path('organizers/', OrganizerListView.as_view(), name='organizer-list'),
-    path('organizers/create/', OrganizerCreateView.as_view(), name='organizer-create'),
-    path('organizers/<int:id>/', OrganizerDeleteView.as_view(), name='organizer-delete'),
-    path('me/', CurrentUserView.as_view(), name='current-user'),
-    path('inquiries/', InquiryCreateView.as_view(), name='inquiry-create'),
-    path('inquiries/list/', InquiryListView.as_view(), name='inquiry-list'),
-    path('inquiries/unread-count/', InquiryUnreadCountView.as_view(), name='inquiry-unread-count'),
-    path('inquiries/<int:id>/mark-read/', InquiryMarkReadView.as_view(), name='inquiry-mark-read'),
-    path('inquiries/<int:id>/mark-unread/', InquiryMarkUnreadView.as_view(), name='inquiry-mark-unread'),
-    path('events/', EventListCreateView.as_view(), name='event-list-create'),
-    path('events/<int:id>/', EventDetailView.as_view(), name='event-detail'),
-    path('events/<int:id>/set-active/', EventSetActiveView.as_view(), name='event-set-active'),
+    path('health/live/', liveness, name='health-live'),
+    path('health/ready/', readiness, name='health-ready'),
+    path('initiate-payment/', lazy_view('tickets.views.InitiatePaymentView'), name='initiate-payment'),
+    path('verify-payment/', lazy_view('tickets.views.VerifyPaymentView'), name='verify-payment'),
+    path('ticket/<uuid:id>/', lazy_view('tickets.views.TicketDetailView'), name='ticket-detail'),
+    path('tickets/lookup/', lazy_view('tickets.lookup_views.TicketLookupView'), name='ticket-lookup'),
+    path('stats/', lazy_view('tickets.views.DashboardStatsView'), name='stats'),
+    path('transactions/', lazy_view('tickets.views.TransactionListView'), name='transactions-list'),
+    path('settings/', lazy_view('tickets.views.EventSettingsView'), name='event-settings'),
+    path('check-in/', lazy_view('tickets.views.CheckInView'), name='check-in'),
+    path('analytics/events/', lazy_view('tickets.analytics_views.EventAnalyticsView'), name='analytics-events'),
+    path('analytics/yoy/', lazy_view('tickets.analytics_views.YearOverYearAnalyticsView'), name='analytics-yoy'),
+    path('organizers/', lazy_view('tickets.user_views.OrganizerListView'), name='organizer-list'),
+    path('organizers/create/', lazy_view('tickets.user_views.OrganizerCreateView'), name='organizer-create'),
+    path('organizers/<int:id>/', lazy_view('tickets.user_views.OrganizerDeleteView'), name='organizer-delete'),
+    path('me/', lazy_view('tickets.user_views.CurrentUserView'), name='current-user'),
+    path('inquiries/', lazy_view('tickets.inquiry_views.InquiryCreateView'), name='inquiry-create'),
+    path('inquiries/list/', lazy_view('tickets.inquiry_views.InquiryListView'), name='inquiry-list'),
+    path('inquiries/unread-count/', lazy_view('tickets.inquiry_views.InquiryUnreadCountView'), name='inquiry-unread-count'),
+    path('inquiries/bulk/', lazy_view('tickets.inquiry_views.InquiryBulkActionView'), name='inquiry-bulk'),
+    path('inquiries/<int:id>/mark-read/', lazy_view('tickets.inquiry_views.InquiryMarkReadView'), name='inquiry-mark-read'),
+    path('inquiries/<int:id>/mark-unread/', lazy_view('tickets.inquiry_views.InquiryMarkUnreadView'), name='inquiry-mark-unread'),
+    path('events/', lazy_view('tickets.event_views.EventListCreateView'), name='event-list-create'),
+    path('events/<int:id>/', lazy_view('tickets.event_views.EventDetailView'), name='event-detail'),
+    path('events/deletion-jobs/<int:id>/', lazy_view('tickets.event_views.EventDeletionJobView'), name='event-deletion-job'),
+    path('events/<int:id>/set-active/', lazy_view('tickets.event_views.EventSetActiveView'), name='event-set-active'),
+    path('profiles/', lazy_view('tickets.profile_views.ProfileListView'), name='profile-list'),
+    path('profiles/token/', lazy_view('tickets.profile_views.ProfileTokenView'), name='profile-token'),
+    path('profiles/<int:id>/download/', lazy_view('tickets.profile_views.ProfileDownloadView'), name='profile-download'),
 ]
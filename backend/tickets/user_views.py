@@ -2,6 +2,8 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions, serializers
 from django.contrib.auth.models import User
+from .serializers import values_queryset, values_rows
+from .authentication import resolve_user
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -15,9 +17,8 @@ class OrganizerListView(APIView):
         if not request.user.is_superuser:
             return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
         
-        users = User.objects.all().order_by('-date_joined')
-        serializer = UserSerializer(users, many=True)
-        return Response(serializer.data)
+        users = values_queryset(User.objects.all().order_by('-date_joined'), UserSerializer)
+        return Response(values_rows(users, UserSerializer))
 
 class OrganizerCreateView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -69,5 +70,5 @@ class CurrentUserView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        serializer = UserSerializer(request.user)
+        serializer = UserSerializer(resolve_user(request.user))
         return Response(serializer.data)
@@ -2,14 +2,21 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, generics, permissions
 from django.conf import settings
-from .models import Ticket, Event
-from .serializers import TicketSerializer, EventSerializer
-import requests
-import os
+from django.db import transaction
+from .models import Ticket, Event, allocate_short_codes
+from .serializers import TicketSerializer, EventSerializer, values_queryset, values_rows
+from .db_routers import use_replica
+from .caching import cache_response, bump_version, bump_tickets, ticket_namespace, EVENTS, TICKETS, TICKETS_BULK
+from .idempotency import run_idempotent
+from .throttling import IPThrottle, ReferenceThrottle
+from . import paystack
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.filters import SearchFilter
 
 class InitiatePaymentView(APIView):
+    throttle_classes = [IPThrottle, ReferenceThrottle]
+    throttle_scope = 'initiate_payment'
+
     def post(self, request):
         reference = request.data.get('reference')
         email = request.data.get('email')
@@ -31,25 +38,36 @@ class InitiatePaymentView(APIView):
         if not reference or not email or not names:
             return Response({'error': 'Missing required fields'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Check if already exists to prevent duplicates
-        if Ticket.objects.filter(paystack_reference=reference).exists():
-             return Response({'message': 'Transaction already initialized'}, status=status.HTTP_200_OK)
-
-        tickets = []
-        for attendee_name in names:
-            ticket = Ticket.objects.create(
-                event=event,
-                name=attendee_name,
-                email=email,
-                phone_number=phone_number,
-                paystack_reference=reference,
-                verified=False # Pending
-            )
-            tickets.append(ticket)
-        
-        return Response({'message': 'Transaction initialized', 'count': len(tickets)}, status=status.HTTP_201_CREATED)
+        # The key row and the tickets commit together, so concurrent
+        # double-submits create tickets once and the rest replay the response
+        idempotency_key = request.headers.get('Idempotency-Key') or f'reference:{reference}'
+        payload = {'reference': reference, 'email': email, 'phone_number': phone_number, 'names': names}
+
+        def create_tickets():
+            # References initialized before idempotency keys were recorded
+            if Ticket.objects.filter(paystack_reference=reference).exists():
+                return status.HTTP_200_OK, {'message': 'Transaction already initialized'}
+            tickets = Ticket.objects.bulk_create([
+                Ticket(
+                    event=event,
+                    name=attendee_name,
+                    email=email,
+                    phone_number=phone_number,
+                    paystack_reference=reference,
+                    verified=False, # Pending
+                    short_code=short_code,
+                )
+                for attendee_name, short_code in zip(names, allocate_short_codes(len(names)))
+            ])
+            transaction.on_commit(lambda: bump_version(TICKETS))
+            return status.HTTP_201_CREATED, {'message': 'Transaction initialized', 'count': len(tickets)}
+
+        return run_idempotent(idempotency_key, 'initiate-payment', payload, create_tickets)
 
 class VerifyPaymentView(APIView):
+    throttle_classes = [IPThrottle, ReferenceThrottle]
+    throttle_scope = 'verify_payment'
+
     def post(self, request):
         reference = request.data.get('reference')
         
@@ -57,21 +75,19 @@ class VerifyPaymentView(APIView):
             return Response({'error': 'No reference provided'}, status=status.HTTP_400_BAD_REQUEST)
 
         # Verify with Paystack
-        secret_key = os.environ.get('PAYSTACK_SECRET_KEY')
         verify_success = True 
         
-        if secret_key:
+        if paystack.is_configured():
              try:
-                headers = {
-                    'Authorization': f'Bearer {secret_key}',
-                    'Content-Type': 'application/json',
-                }
-                url = f"https://api.paystack.co/transaction/verify/{reference}"
-                response = requests.get(url, headers=headers)
-                data = response.json()
-                if not data['status'] or data['data']['status'] != 'success':
+                data = paystack.verify_transaction(reference)
+                if not paystack.transaction_succeeded(data):
                     verify_success = False
                     print(f"Paystack verification failed: {data}")
+             except paystack.PaystackError as e:
+                 print(f"Paystack verification error: {e}")
+                 # Paystack answered but refused (bad key, rate limit): not verified
+                 if e.status_code is not None and e.status_code < 500:
+                     verify_success = False
              except Exception as e:
                  print(f"Paystack verification error: {e}")
                  # verification failed due to network?
@@ -79,7 +95,9 @@ class VerifyPaymentView(APIView):
 
         if verify_success:
             # Update existing tickets as verified
-            updated_count = Ticket.objects.filter(paystack_reference=reference).update(verified=True)
+            ids = list(Ticket.objects.filter(paystack_reference=reference).values_list('id', flat=True))
+            updated_count = Ticket.objects.filter(id__in=ids).update(verified=True)
+            bump_tickets(ids)
             
             # If no tickets found (maybe initialization failed or direct verify call), create them
             if updated_count == 0:
@@ -114,6 +132,14 @@ class TicketDetailView(generics.RetrieveAPIView):
     queryset = Ticket.objects.all()
     serializer_class = TicketSerializer
     lookup_field = 'id'
+    throttle_classes = [IPThrottle]
+    throttle_scope = 'ticket_detail'
+
+    # Versioned per ticket: other tickets' sales and check-ins leave this page cached.
+    # Private: the ticket carries the buyer's email and phone number
+    @cache_response(lambda id, **kwargs: ticket_namespace(id), TICKETS_BULK)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
 
 class DashboardStatsView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -160,6 +186,18 @@ class TransactionListView(generics.ListAPIView):
     search_fields = ['name', 'email', 'paystack_reference', 'phone_number']
     permission_classes = [permissions.IsAuthenticated]
 
+    @use_replica
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        # Paginate raw rows instead of model instances (see serializers.values_rows)
+        rows = values_queryset(self.filter_queryset(self.get_queryset()), TicketSerializer)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(values_rows(page, TicketSerializer))
+        return Response(values_rows(rows, TicketSerializer))
+
     def get_queryset(self):
          # Optionally filter by active event
          qs = super().get_queryset()
@@ -175,6 +213,7 @@ class EventSettingsView(APIView):
             return [permissions.AllowAny()]
         return [permissions.IsAuthenticated()]
 
+    @cache_response(EVENTS, public=True)
     def get(self, request):
         # Get active event or create default
         event = Event.objects.filter(is_active=True).first()
@@ -243,7 +282,8 @@ class CheckInView(APIView):
         # Serialize the checked-in tickets to return details
         # We re-fetch or reuse queryset (update doesn't invalidate filter if we just want data)
         # However, update might not reflect in queryset cache if not refreshed usually, but here we just need names
-        attendees = TicketSerializer(tickets_to_check_in, many=True).data
+        attendees = values_rows(values_queryset(tickets_to_check_in, TicketSerializer), TicketSerializer)
+        bump_tickets(attendee['id'] for attendee in attendees)
 
         return Response({
             'message': f'Successfully checked in.', 
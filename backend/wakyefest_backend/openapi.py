@@ -0,0 +1,50 @@
+"""
+OpenAPI schema and Swagger UI, loaded lazily.
+
+drf_yasg and schema generation are only paid for when the docs are requested.
+When OPENAPI_SCHEMA_FILE exists (``manage.py generate_swagger <file>`` at image
+build time) the schema is served from it instead of being generated.
+"""
+import functools
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+from drf_yasg import openapi
+
+api_info = openapi.Info(
+    title="Waakye Fest API",
+    default_version='v1',
+    description="API documentation for Waakye Fest ticketing system",
+    contact=openapi.Contact(email="admin@wakyefest.com"),
+)
+
+
+@functools.cache
+def load_cached_schema():
+    path = settings.OPENAPI_SCHEMA_FILE
+    if not path or not Path(path).is_file():
+        return None
+    return Path(path).read_bytes()
+
+
+@functools.cache
+def get_swagger_ui_view():
+    from rest_framework import permissions
+    from drf_yasg.views import get_schema_view
+
+    schema_view = get_schema_view(
+        api_info,
+        public=True,
+        permission_classes=(permissions.AllowAny,),
+    )
+    return schema_view.with_ui('swagger', cache_timeout=0)
+
+
+def swagger_ui(request, *args, **kwargs):
+    # Swagger UI fetches its spec from the same URL with ?format=openapi
+    if request.GET.get('format') == 'openapi':
+        schema = load_cached_schema()
+        if schema is not None:
+            return HttpResponse(schema, content_type='application/openapi+json')
+    return get_swagger_ui_view()(request, *args, **kwargs)
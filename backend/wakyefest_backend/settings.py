@@ -5,6 +5,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 
 import dj_database_url
 from decouple import config, Csv
+from django.core.exceptions import ImproperlyConfigured
 
 SECRET_KEY = config('SECRET_KEY', default='django-insecure-dev-key')
 DEBUG = config('DEBUG', default=False, cast=bool)
@@ -33,21 +34,50 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'tickets.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'tickets.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    # Token buckets for the public endpoints (see tickets/throttling.py): burst/refill period
+    'DEFAULT_THROTTLE_RATES': {
+        'inquiry': config('THROTTLE_INQUIRY', default='5/min'),
+        'initiate_payment': config('THROTTLE_INITIATE_PAYMENT', default='20/min'),
+        'initiate_payment_reference': config('THROTTLE_INITIATE_PAYMENT_REFERENCE', default='10/min'),
+        'verify_payment': config('THROTTLE_VERIFY_PAYMENT', default='30/min'),
+        'verify_payment_reference': config('THROTTLE_VERIFY_PAYMENT_REFERENCE', default='20/min'),
+        'ticket_detail': config('THROTTLE_TICKET_DETAIL', default='60/min'),
+        'ticket_lookup': config('THROTTLE_TICKET_LOOKUP', default='20/hour'),
+        'ticket_lookup_identifier': config('THROTTLE_TICKET_LOOKUP_IDENTIFIER', default='5/hour'),
+    },
+    # Reverse proxies in front of gunicorn. The per-IP throttles take the client address from
+    # that many hops back in X-Forwarded-For; 0 uses REMOTE_ADDR and ignores the header, which
+    # clients can set to anything
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
 }
 
 from datetime import timedelta
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1), # Long session for MVP
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
+    'TOKEN_OBTAIN_SERIALIZER': 'tickets.authentication.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'tickets.authentication.ClaimsTokenRefreshSerializer',
 }
 
+# 'stateless' trusts the user claims in access tokens (no user query per request),
+# 'database' loads the user on every request like plain simplejwt (see tickets/authentication.py).
+# Stateless revocations live in the cache, so it is only the default with a shared (Redis) cache
+JWT_AUTH_MODE = config('JWT_AUTH_MODE', default='stateless' if config('REDIS_URL', default='') else 'database')
+JWT_USER_CACHE_SECONDS = config('JWT_USER_CACHE_SECONDS', default=60, cast=int) # User lookups for tokens without claims
+
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'tickets.throttling.LoadSheddingMiddleware',
+    'tickets.compression.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -56,8 +86,18 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'tickets.profiling.RequestProfilingMiddleware',
+    'tickets.db_routers.ReplicaStickinessMiddleware',
 ]
 
+# On-demand request profiling (see tickets/profiling.py)
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=True, cast=bool)
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=0, cast=int) # Profile 1 in N requests, 0 disables sampling
+PROFILING_BACKEND = config('PROFILING_BACKEND', default='cprofile') # 'cprofile' or 'pyinstrument'
+PROFILING_MAX_STORED = config('PROFILING_MAX_STORED', default=200, cast=int)
+PROFILING_TOKEN_MAX_AGE = config('PROFILING_TOKEN_MAX_AGE', default=3600, cast=int) # Seconds
+PROFILING_STATS_LIMIT = config('PROFILING_STATS_LIMIT', default=80, cast=int) # Rows of cProfile output kept
+
 ROOT_URLCONF = 'wakyefest_backend.urls'
 
 TEMPLATES = [
@@ -88,9 +128,129 @@ DATABASES = {
 # Neon.tech serverless Postgres requires SSL
 # Add SSL configuration if using Neon
 if 'neon.tech' in DATABASES['default'].get('HOST', ''):
-    DATABASES['default']['OPTIONS'] = {
-        'sslmode': 'require',
+    DATABASES['default'].setdefault('OPTIONS', {})['sslmode'] = 'require'
+
+# Optional read replica for analytics and listing endpoints (see tickets/db_routers.py).
+# Two local SQLite files work too, e.g. sqlite:////tmp/replica.sqlite3
+DATABASE_REPLICA_URL = config('DATABASE_REPLICA_URL', default='')
+if DATABASE_REPLICA_URL:
+    # The read-your-writes pin lives in the cache; per-process, it would only reach the worker
+    # that handled the write and the user's next request elsewhere would read the lagging replica.
+    # DEBUG is allowed for single-process runserver setups.
+    if not config('REDIS_URL', default='') and not DEBUG:
+        raise ImproperlyConfigured('DATABASE_REPLICA_URL needs REDIS_URL so every worker sees read-your-writes pins')
+    DATABASES['replica'] = dj_database_url.parse(DATABASE_REPLICA_URL)
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+    if 'neon.tech' in DATABASES['replica'].get('HOST', ''):
+        DATABASES['replica'].setdefault('OPTIONS', {})['sslmode'] = 'require'
+
+DATABASE_ROUTERS = ['tickets.db_routers.ReplicaRouter']
+# Seconds a user keeps reading from the primary after their own write
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=10, cast=int)
+
+# Connection reuse. DB_POOL_MODE is one of:
+#   'none'       - new connection per request (old behaviour)
+#   'persistent' - keep the connection open across requests for DB_CONN_MAX_AGE seconds
+#   'pool'       - psycopg3 connection pool shared by the worker's threads
+# Health checks make sure a reused connection that Neon closed while idle is
+# replaced before the request uses it.
+DB_POOL_MODE = config('DB_POOL_MODE', default='persistent')
+
+for db in DATABASES.values():
+    if DB_POOL_MODE == 'persistent':
+        db['CONN_MAX_AGE'] = config('DB_CONN_MAX_AGE', default=600, cast=int)
+        db['CONN_HEALTH_CHECKS'] = config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool)
+    elif DB_POOL_MODE == 'pool' and db['ENGINE'] == 'django.db.backends.postgresql':
+        # Pooling requires psycopg >= 3 and CONN_MAX_AGE = 0 (the pool owns connection lifetime)
+        db['CONN_MAX_AGE'] = 0
+        db.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': config('DB_POOL_MIN_SIZE', default=1, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=4, cast=int),
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+            'max_idle': config('DB_POOL_MAX_IDLE', default=300, cast=int),
+        }
+    else:
+        db['CONN_MAX_AGE'] = 0
+
+    # Neon's -pooler endpoints run PgBouncer in transaction mode, which cannot hold
+    # server-side cursors open between transactions.
+    if '-pooler' in db.get('HOST', ''):
+        db['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+# Cache shared by all gunicorn workers when REDIS_URL is set; per-process otherwise
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
     }
+# Cached state that writes must invalidate everywhere is only kept when every worker sees it
+SHARED_CACHE = bool(REDIS_URL)
+
+# Server-side response cache for public settings, ticket pages and analytics (see tickets/caching.py).
+# Off without a shared cache: each worker would keep serving its own stale versions
+RESPONSE_CACHE_ENABLED = config('RESPONSE_CACHE_ENABLED', default=SHARED_CACHE, cast=bool)
+RESPONSE_CACHE_TIMEOUT = config('RESPONSE_CACHE_TIMEOUT', default=300, cast=int) # Seconds
+
+# gzip/brotli response compression (see tickets/compression.py); brotli needs `pip install brotli`
+COMPRESSION_ENABLED = config('COMPRESSION_ENABLED', default=True, cast=bool)
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=1024, cast=int) # Bytes; smaller bodies are sent as-is
+COMPRESSION_GZIP_LEVEL = config('COMPRESSION_GZIP_LEVEL', default=6, cast=int)
+COMPRESSION_BROTLI_QUALITY = config('COMPRESSION_BROTLI_QUALITY', default=4, cast=int)
+# Only JSON under these paths (plus streamed exports) is compressed; HTML never is (BREACH)
+COMPRESSION_PATHS = config('COMPRESSION_PATHS', default='/api/', cast=Csv())
+# Responses carrying tokens are not compressed either
+COMPRESSION_EXCLUDED_PATHS = config('COMPRESSION_EXCLUDED_PATHS', default='/api/token/,/api/profiles/token/', cast=Csv())
+
+# Outgoing email (ticket re-sends from the public lookup). Prints to the console unless configured.
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
+EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='Waakye Fest <tickets@wakyefest.com>')
+
+# Paystack. PAYSTACK_BASE_URL can point at `manage.py paystack_stub` for local runs.
+PAYSTACK_SECRET_KEY = config('PAYSTACK_SECRET_KEY', default='')
+PAYSTACK_BASE_URL = config('PAYSTACK_BASE_URL', default='https://api.paystack.co')
+PAYSTACK_TIMEOUT = config('PAYSTACK_TIMEOUT', default=10, cast=int) # Seconds
+
+# Unverified tickets older than this are reclaimed by `manage.py reap_pending_tickets`
+PENDING_TICKET_TTL_HOURS = config('PENDING_TICKET_TTL_HOURS', default=24, cast=int)
+# Stored idempotency keys older than this are deleted by the same command; keep it above the TTL
+IDEMPOTENCY_KEY_TTL_HOURS = config('IDEMPOTENCY_KEY_TTL_HOURS', default=72, cast=int)
+
+# Load shedding (see tickets/throttling.py): above the target latency anonymous reads get 503,
+# above twice the target everything except the critical paths does
+LOAD_SHED_ENABLED = config('LOAD_SHED_ENABLED', default=True, cast=bool)
+LOAD_SHED_TARGET_MS = config('LOAD_SHED_TARGET_MS', default=1500, cast=int)
+LOAD_SHED_RETRY_AFTER = config('LOAD_SHED_RETRY_AFTER', default=5, cast=int) # Seconds
+LOAD_SHED_CRITICAL_PATHS = config(
+    'LOAD_SHED_CRITICAL_PATHS',
+    default='/api/verify-payment/,/api/check-in/,/api/health/,/api/token/,/admin/',
+    cast=Csv(),
+)
+
+# Readiness probe (see tickets/health_views.py); checks are cached per worker
+HEALTH_CHECK_CACHE_SECONDS = config('HEALTH_CHECK_CACHE_SECONDS', default=5, cast=int)
+HEALTH_MIGRATIONS_CHECK_SECONDS = config('HEALTH_MIGRATIONS_CHECK_SECONDS', default=300, cast=int)
+HEALTH_DB_LATENCY_WARN_MS = config('HEALTH_DB_LATENCY_WARN_MS', default=200, cast=int)
+HEALTH_DB_LATENCY_FAIL_MS = config('HEALTH_DB_LATENCY_FAIL_MS', default=1000, cast=int) # Readiness fails above this
+HEALTH_POOL_MAX_WAITING = config('HEALTH_POOL_MAX_WAITING', default=5, cast=int) # Requests queued for a pooled connection
+HEALTH_QUEUE_WARN_DEPTH = config('HEALTH_QUEUE_WARN_DEPTH', default=10, cast=int)
+
+# Background event deletion (see tickets/jobs.py)
+EVENT_DELETION_BATCH_SIZE = config('EVENT_DELETION_BATCH_SIZE', default=1000, cast=int)
+EVENT_DELETION_STALE_SECONDS = config('EVENT_DELETION_STALE_SECONDS', default=120, cast=int) # No heartbeat for this long = abandoned
 
 
 # CORS Configuration
@@ -146,3 +306,10 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+SWAGGER_SETTINGS = {
+    'DEFAULT_INFO': 'wakyefest_backend.openapi.api_info',
+}
+# Pre-generated schema served instead of generating it per request.
+# Written at image build time by: python manage.py generate_swagger <file> --overwrite
+OPENAPI_SCHEMA_FILE = config('OPENAPI_SCHEMA_FILE', default=str(BASE_DIR / 'openapi.json'))
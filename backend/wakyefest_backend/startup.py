@@ -0,0 +1,71 @@
+"""
+Startup helpers: lazily imported URL views and a warm-up hook.
+
+URLconfs reference views by dotted path through ``LazyView`` so importing
+the URLconf does not import every view module and its dependencies. The
+gunicorn master calls ``warm_up()`` after preloading the app, so workers fork
+with views, URL resolver and cached OpenAPI schema already in memory.
+"""
+from django.db import connections
+from django.urls import get_resolver, URLPattern, URLResolver
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
+
+
+class LazyView:
+    """URL callback that imports its view on first use"""
+    # DRF's as_view() marks views csrf_exempt; Django checks this before calling
+    csrf_exempt = True
+
+    def __init__(self, dotted_path, **initkwargs):
+        self.dotted_path = dotted_path
+        self._initkwargs = initkwargs
+        self.__module__, _, self.__name__ = dotted_path.rpartition('.')
+        self.__qualname__ = self.__name__
+
+    @cached_property
+    def view(self):
+        view = import_string(self.dotted_path)
+        if hasattr(view, 'as_view'):
+            view = view.as_view(**self._initkwargs)
+        return view
+
+    # Attributes drf_yasg's endpoint enumeration reads from DRF views
+    @property
+    def cls(self):
+        return self.view.cls
+
+    @property
+    def initkwargs(self):
+        return self.view.initkwargs
+
+    def __call__(self, request, *args, **kwargs):
+        return self.view(request, *args, **kwargs)
+
+
+def lazy_view(dotted_path, **initkwargs):
+    return LazyView(dotted_path, **initkwargs)
+
+
+def _iter_patterns(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _iter_patterns(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            yield pattern
+
+
+def warm_up():
+    """Import everything a first request would, without touching the database"""
+    from .openapi import load_cached_schema
+
+    resolver = get_resolver()
+    for pattern in _iter_patterns(resolver.url_patterns):
+        if isinstance(pattern.callback, LazyView):
+            pattern.callback.view
+    # Builds the reverse/resolve lookup tables
+    resolver.reverse_dict
+    load_cached_schema()
+
+    # Never hand an open connection to forked workers
+    connections.close_all()